@@ -1,4 +1,12 @@
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
+import os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
 import json
+from agents.plans import load_plan
 
 
 class ApplicationComposerAgent:
@@ -8,8 +16,7 @@ class ApplicationComposerAgent:
     """
 
     def run(self, app_spec_path, strategy_path=None):
-        with open(app_spec_path) as f:
-            app_spec = json.load(f)
+        app_spec = load_plan(app_spec_path)
 
         # -------- NORMALIZE TOP-LEVEL SPEC --------
         if "website" not in app_spec:
@@ -86,8 +93,6 @@ class ApplicationComposerAgent:
 
 
 if __name__ == "__main__":
-    import sys
-
     out = ApplicationComposerAgent().run(
         app_spec_path=sys.argv[1],
         strategy_path=sys.argv[2] if len(sys.argv) > 2 else None
@@ -1,5 +1,12 @@
-import json
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
 import os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+import json
+from agents.plans import load_plan
 
 
 class BackendBuilderAgent:
@@ -10,8 +17,8 @@ class BackendBuilderAgent:
     """
 
     def run(self, app_plan_path, strategy_path, output_root="generated_projects"):
-        app_plan = self._load(app_plan_path)
-        strategy = self._load(strategy_path)
+        app_plan = load_plan(app_plan_path)
+        strategy = load_plan(strategy_path)
 
         # -------- NORMALIZE APPLICATION --------
         application = app_plan.get("application")
@@ -43,6 +50,7 @@ class BackendBuilderAgent:
             json.dump(backend_plan, f, indent=2)
 
         print(f"✅ backend_plan.json created at {path}")
+        return backend_plan
 
     # ---------------- CORE ----------------
 
@@ -98,14 +106,8 @@ class BackendBuilderAgent:
             .replace("-", "_")
         )
 
-    def _load(self, path):
-        with open(path) as f:
-            return json.load(f)
-
 
 if __name__ == "__main__":
-    import sys
-
     BackendBuilderAgent().run(
         app_plan_path=sys.argv[1],
         strategy_path=sys.argv[2]
@@ -1,15 +1,23 @@
-import json
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
 import os
-from google import genai
-from fastapi.middleware.cors import CORSMiddleware
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+import json
+import re
+
+from agents.llm_gateway import get_gateway
+from agents.plans import load_plan
 
 
 class BackendCodegenAgent:
     """
     Backend code generator.
     - Uses LLM ONCE if needed
-    - Caches generated code
     - Falls back to deterministic FastAPI if LLM is unavailable
+    Caching is done by the orchestrator's build cache, keyed on the plan.
     """
     def _sanitize_python(self, code: str) -> str:
         lines = []
@@ -20,11 +28,10 @@ class BackendCodegenAgent:
         return "\n".join(lines).strip()
 
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        self.client = None
-
-        if api_key:
-            self.client = genai.Client(api_key=api_key)
+        try:
+            self.llm = get_gateway()
+        except RuntimeError:
+            self.llm = None
 
         self.model = "models/gemini-2.5-flash"
 
@@ -33,18 +40,10 @@ class BackendCodegenAgent:
     def run(self, backend_plan_path, output_dir):
         os.makedirs(output_dir, exist_ok=True)
 
-        app_path = os.path.join(output_dir, "app.py")
-        req_path = os.path.join(output_dir, "requirements.txt")
-
-        # ✅ CACHE: Do not regenerate if already exists
-        if os.path.exists(app_path) and os.path.exists(req_path):
-            print("ℹ️ Backend already generated, skipping codegen")
-            return
-
-        plan = self._load(backend_plan_path)
+        plan = load_plan(backend_plan_path)
 
         try:
-            if self.client:
+            if self.llm:
                 print("🧠 Generating backend with LLM")
                 code = self._generate_app_code_llm(plan)
             else:
@@ -90,15 +89,11 @@ REQUIREMENTS:
 - NO explanations, ONLY Python code
 """
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt
-        )
-
-        code = response.text.strip()
+        code = self.llm.generate(self.model, prompt).strip()
         code = self._sanitize_python(code)
 
         if "FastAPI" not in code or "app =" not in code:
+            self.llm.forget(self.model, prompt)
             raise RuntimeError("Invalid FastAPI code from LLM")
 
         return code
@@ -112,7 +107,7 @@ REQUIREMENTS:
         route_blocks = []
 
         for r in routes:
-            fn_name = r["name"].replace("-", "_")
+            fn_name = re.sub(r"\W+", "_", r.get("name") or r["path"]).strip("_") or "index"
             path = r["path"]
 
             route_blocks.append(f"""
@@ -172,14 +167,8 @@ def health():
         with open(os.path.join(base, name), "w") as f:
             f.write(content.strip() + "\n")
 
-    def _load(self, path):
-        with open(path) as f:
-            return json.load(f)
-
 
 if __name__ == "__main__":
-    import sys
-
     BackendCodegenAgent().run(
         backend_plan_path=sys.argv[1],
         output_dir=sys.argv[2]
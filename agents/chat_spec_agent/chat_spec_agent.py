@@ -1,9 +1,21 @@
-import json
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
 import os
-import re
-from google import genai
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+import json
+import asyncio
+
+from agents.llm_gateway import get_gateway
+from agents.chat_spec_agent.json_stream import JSONFieldStream, parse_object
+from agents.chat_spec_agent.session_store import get_store
 
-DRAFT_STATE = "conversation_state.json"
+# Session used when a caller (e.g. the CLI) does not pass one
+DEFAULT_SESSION = "default"
+
+APPROVALS = {"yes", "yes build", "build it", "go"}
 
 
 class ChatSpecAgent:
@@ -13,46 +25,99 @@ class ChatSpecAgent:
     NEVER builds. NEVER auto-approves.
     """
 
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("❌ GEMINI_API_KEY not set")
-
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, store=None):
+        self.llm = get_gateway()
         self.model = "models/gemini-2.5-flash"
+        self.sessions = store or get_store()
 
     # ---------------- PUBLIC ----------------
 
-    def run(self, user_message: str):
-        state = self._load_state()
-
-        # Explicit approval check
-        if user_message.strip().lower() in {"yes", "yes build", "build it", "go"}:
-            state["status"] = "approved"
-            self._save_state(state)
-            return state
-
-        prompt = self._build_prompt(state, user_message)
-
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt
-        )
+    def run(self, user_message: str, session_id=DEFAULT_SESSION):
+        # One turn at a time per session; other sessions are not blocked
+        with self.sessions.lock(session_id):
+            state = self._load_state(session_id)
+
+            # Explicit approval check
+            if user_message.strip().lower() in APPROVALS:
+                return self._approve(session_id, state)
+
+            prompt = self._build_prompt(state, user_message)
+            text = self.llm.generate(self.model, prompt)
+            return self._merge(session_id, state, prompt, parse_object(text))
+
+    async def arun(self, user_message: str, session_id=DEFAULT_SESSION):
+        """
+        run() for the async /chat handler: neither the LLM call nor the
+        session store's SQLite I/O blocks the event loop.
+        """
+        async with self.sessions.alock(session_id):
+            state = await asyncio.to_thread(self._load_state, session_id)
+
+            if user_message.strip().lower() in APPROVALS:
+                return await asyncio.to_thread(self._approve, session_id, state)
+
+            prompt = self._build_prompt(state, user_message)
+            text = await self.llm.agenerate(self.model, prompt)
+            return await asyncio.to_thread(
+                self._merge, session_id, state, prompt, parse_object(text)
+            )
+
+    async def astream(self, user_message: str, session_id=DEFAULT_SESSION):
+        """
+        Streaming run(). Yields (event, payload) pairs:
+        - ("token", text) for every chunk the model sends
+        - ("field", {key: value}) when a top-level field of the JSON
+          update is complete, before the rest has arrived
+        - ("reset", {}) when fields sent so far came from text that
+          turned out not to be the JSON object; discard them
+        - ("state", state) once, after the merged state is saved
+
+        The saved state is the object the field parser closed, so it is
+        always the one whose fields were streamed.
+        """
+        async with self.sessions.alock(session_id):
+            state = await asyncio.to_thread(self._load_state, session_id)
+
+            if user_message.strip().lower() in APPROVALS:
+                yield "state", await asyncio.to_thread(self._approve, session_id, state)
+                return
+
+            prompt = self._build_prompt(state, user_message)
+            parser = JSONFieldStream()
+
+            async for chunk in self.llm.astream(self.model, prompt):
+                yield "token", chunk
+
+                fields = parser.feed(chunk)
+                if parser.reset:
+                    yield "reset", {}
+                if fields:
+                    yield "field", fields
+
+            yield "state", await asyncio.to_thread(
+                self._merge, session_id, state, prompt, parser.result()
+            )
+
+    # ---------------- UPDATE ----------------
+
+    def _approve(self, session_id, state):
+        state["status"] = "approved"
+        self._save_state(session_id, state)
+        return state
 
-        text = response.text.strip()
-        match = re.search(r"\{[\s\S]*\}", text)
-        if not match:
+    def _merge(self, session_id, state, prompt, update):
+        """update: the reply's JSON object, None if it had none."""
+        if update is None:
+            self.llm.forget(self.model, prompt)
             raise ValueError("LLM did not return valid JSON")
 
-        update = json.loads(match.group())
-
         # Merge safely
         state["status"] = update.get("status", state["status"])
         state["current_plan"] = update.get("current_plan", state["current_plan"])
         state["suggested_features"] = update.get("suggested_features", [])
         state["questions"] = update.get("questions", [])
 
-        self._save_state(state)
+        self._save_state(session_id, state)
         return state
 
     # ---------------- PROMPT ----------------
@@ -105,10 +170,10 @@ JSON FORMAT:
 
     # ---------------- STATE ----------------
 
-    def _load_state(self):
-        if os.path.exists(DRAFT_STATE):
-            with open(DRAFT_STATE) as f:
-                return json.load(f)
+    def _load_state(self, session_id):
+        state = self.sessions.get(session_id)
+        if state is not None:
+            return state
 
         return {
             "status": "draft",
@@ -121,9 +186,8 @@ JSON FORMAT:
             "questions": []
         }
 
-    def _save_state(self, state):
-        with open(DRAFT_STATE, "w") as f:
-            json.dump(state, f, indent=2)
+    def _save_state(self, session_id, state):
+        self.sessions.put(session_id, state)
 
 
 if __name__ == "__main__":
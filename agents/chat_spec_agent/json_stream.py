@@ -0,0 +1,142 @@
+import json
+
+
+class JSONFieldStream:
+    """
+    Incremental parser for one streamed JSON object.
+
+    feed() takes raw LLM text chunks and returns the top-level fields
+    whose values completed inside them, e.g. {"status": "draft"} as soon
+    as the status string closes, long before the object does. Text
+    around the object (```json fences, prose) is ignored: parsing starts
+    at the first "{", and restarts at the next one if that turns out
+    not to open a JSON object (a brace in prose).
+
+    A restart can drop fields an earlier feed() already returned;
+    `reset` is then True after that feed() and the caller should discard
+    them.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.reset = False
+        self._reset(start=None)
+        self.closed = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        self.reset = False
+        completed = {}
+
+        while self.pos < len(self.buffer) and not self.closed:
+            ch = self.buffer[self.pos]
+
+            # Before the object: skip prose and fences up to a "{"
+            if self.start is None:
+                if ch == "{":
+                    self._reset(start=self.pos)
+                    self.depth = 1
+                self.pos += 1
+                continue
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key is None:
+                        self.key = json.loads(self.buffer[self.key_start:self.pos + 1])
+                        self.expect = "colon"
+                self.pos += 1
+                continue
+
+            if self.depth == 1 and self.expect != "value" and not ch.isspace():
+                # Between fields only a key, ":" or "}" can follow; anything
+                # else means the "{" was prose, e.g. "use {name} here"
+                if not self._expected(ch):
+                    self._restart(completed)
+                    continue
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.key is None:
+                    self.key_start = self.pos
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    if not self._value_closed(completed, self.pos):
+                        self._restart(completed)
+                        continue
+                    self.closed = True
+            elif ch == ":" and self.depth == 1:
+                self.value_start = self.pos + 1
+                self.expect = "value"
+            elif ch == "," and self.depth == 1:
+                if not self._value_closed(completed, self.pos):
+                    self._restart(completed)
+                    continue
+                self.expect = "key"
+
+            self.pos += 1
+
+        self.fields.update(completed)
+        return completed
+
+    def result(self):
+        """The whole object once closed, else None."""
+        return self.fields if self.closed else None
+
+    # ---------------- HELPERS ----------------
+
+    def _expected(self, ch):
+        if self.expect == "key":
+            return ch == '"' or (ch == "}" and not self.fields_seen)
+        return ch == ":"  # expect == "colon"
+
+    def _value_closed(self, completed, end):
+        """False if the value is not valid JSON (the object was not one)."""
+        if self.key is None or self.value_start is None:
+            # Only an empty object closes without a value
+            return self.expect == "key" and not self.fields_seen
+        raw = self.buffer[self.value_start:end].strip()
+        try:
+            completed[self.key] = json.loads(raw)
+        except ValueError:
+            return False
+        self.fields_seen = True
+        self.key = None
+        self.value_start = None
+        return True
+
+    def _restart(self, completed):
+        """Drop the false start and look for the next "{" after it."""
+        self.pos = self.start + 1
+        if self.fields:
+            self.reset = True
+        completed.clear()
+        self._reset(start=None)
+
+    def _reset(self, start):
+        self.start = start
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.expect = "key"
+        self.fields_seen = False
+        self.fields = {}
+
+
+def parse_object(text):
+    """The first JSON object in a complete reply, as JSONFieldStream finds it, or None."""
+    parser = JSONFieldStream()
+    parser.feed(text)
+    return parser.result()
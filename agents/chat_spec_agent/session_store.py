@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SESSION_DB = os.getenv(
+    "AUTODEV_SESSION_DB",
+    os.path.join(BASE_DIR, ".autodev_sessions", "sessions.sqlite")
+)
+IDLE_TTL_S = float(os.getenv("AUTODEV_SESSION_TTL_S", 7 * 24 * 3600))
+MAX_CACHED = 1000
+
+# Expiry sweeps run at most this often
+SWEEP_INTERVAL_S = 600
+
+# A read refreshes the idle timer, at most once per this many seconds
+TOUCH_INTERVAL_S = 60
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class SessionStore:
+    """
+    Conversation state per chat session.
+
+    - SQLite (WAL) is the source of truth; each save is one transaction
+    - the most recently used states are kept in an in-memory LRU
+    - lock(id) / alock(id) serialize the turns of one session, while
+      different sessions run in parallel
+    - sessions idle (neither read nor saved) for longer than
+      idle_ttl_s are deleted
+    """
+
+    def __init__(self, path=SESSION_DB, idle_ttl_s=IDLE_TTL_S, max_cached=MAX_CACHED):
+        self.path = path
+        self.idle_ttl_s = idle_ttl_s
+        self.max_cached = max_cached
+
+        self.cache = OrderedDict()
+        self.guard = threading.Lock()
+        self.locks = weakref.WeakValueDictionary()
+        self.async_locks = weakref.WeakValueDictionary()
+        self.last_sweep = 0.0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                state TEXT,
+                updated_at REAL
+            )
+        """)
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_idle ON sessions (updated_at)"
+        )
+        self.db.commit()
+
+    # ---------------- LOCKS ----------------
+
+    def lock(self, session_id):
+        """threading.Lock for sync callers; held for a whole turn."""
+        with self.guard:
+            lock = self.locks.get(session_id)
+            if lock is None:
+                lock = self.locks[session_id] = threading.Lock()
+            return lock
+
+    def alock(self, session_id):
+        """asyncio.Lock for the async handlers (one event loop)."""
+        with self.guard:
+            lock = self.async_locks.get(session_id)
+            if lock is None:
+                lock = self.async_locks[session_id] = asyncio.Lock()
+            return lock
+
+    # ---------------- STATE ----------------
+
+    def get(self, session_id):
+        """A copy of the session's state, or None."""
+        now = time.time()
+        with self.guard:
+            entry = self.cache.get(session_id)
+            if entry is None:
+                row = self.db.execute(
+                    "SELECT state, updated_at FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = self.cache[session_id] = (row[0], row[1])
+                self._trim()
+
+            if now - entry[1] > self.idle_ttl_s:
+                self._delete(session_id)
+                return None
+
+            if now - entry[1] > TOUCH_INTERVAL_S:
+                self._touch(session_id, entry[0], now)
+
+            self.cache.move_to_end(session_id)
+            return json.loads(entry[0])
+
+    def put(self, session_id, state):
+        now = time.time()
+        text = json.dumps(state)
+        with self.guard:
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                    (session_id, text, now)
+                )
+            self.cache[session_id] = (text, now)
+            self.cache.move_to_end(session_id)
+            self._trim()
+
+            if now - self.last_sweep > SWEEP_INTERVAL_S:
+                self._sweep(now)
+
+    def stats(self):
+        with self.guard:
+            sessions = self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            return {"sessions": sessions, "cached": len(self.cache)}
+
+    # ---------------- EVICTION ----------------
+
+    def _trim(self):
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+
+    def _touch(self, session_id, text, now):
+        with self.db:
+            self.db.execute(
+                "UPDATE sessions SET updated_at = ? WHERE id = ?", (now, session_id)
+            )
+        self.cache[session_id] = (text, now)
+
+    def _delete(self, session_id):
+        self.cache.pop(session_id, None)
+        with self.db:
+            self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def _sweep(self, now):
+        self.last_sweep = now
+        cutoff = now - self.idle_ttl_s
+        with self.db:
+            self.db.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        for session_id in [s for s, (_, t) in self.cache.items() if t < cutoff]:
+            del self.cache[session_id]
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_store():
+    """One store (and SQLite connection) per process."""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = SessionStore()
+        return _shared_store
@@ -0,0 +1,158 @@
+import os
+
+# Dataset extension -> columnar format
+FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "arrow",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def columnar_format(path):
+    """"parquet", "arrow" (Feather v2 / Arrow IPC file) or None."""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for Parquet/Feather/Arrow datasets (pip install pyarrow)"
+        ) from None
+    return pyarrow
+
+
+# ---------------- METADATA ----------------
+
+def read_metadata(path):
+    """
+    Schema, row count and per-column stats without reading column data:
+    the Parquet footer (row-group statistics), or the Arrow IPC footer
+    and record batch headers over a memory map.
+    """
+    pa = _pyarrow()
+
+    if columnar_format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        meta = pq.ParquetFile(path).metadata
+        schema = meta.schema.to_arrow_schema()
+        rows = meta.num_rows
+        stats = _parquet_stats(meta, schema)
+        batches = meta.num_row_groups
+    else:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            schema = reader.schema
+            nulls = dict.fromkeys(schema.names, 0)
+            rows = 0
+            # Zero-copy: a batch is its header plus pointers into the map
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                rows += batch.num_rows
+                for name, column in zip(schema.names, batch.columns):
+                    nulls[name] += column.null_count
+            batches = reader.num_record_batches
+
+        stats = {
+            field.name: {"dtype": _kind(field.type), "nulls": nulls[field.name]}
+            for field in schema
+        }
+
+    for column in stats.values():
+        nulls = column.pop("nulls")
+        column["null_rate"] = round(nulls / rows, 4) if rows and nulls is not None else None
+
+    return {
+        "format": columnar_format(path),
+        "schema": schema,
+        "rows": rows,
+        "columns": schema.names,
+        "column_stats": stats,
+        "batches": batches
+    }
+
+
+def _parquet_stats(meta, schema):
+    stats = {field.name: {"dtype": _kind(field.type), "nulls": 0} for field in schema}
+    bounds = {}
+
+    for g in range(meta.num_row_groups):
+        group = meta.row_group(g)
+        for c in range(group.num_columns):
+            chunk = group.column(c)
+            name = chunk.path_in_schema
+            if name not in stats:
+                continue  # nested leaf
+
+            s = chunk.statistics
+            if s is None or stats[name]["nulls"] is None:
+                # A row group without statistics: the totals are unknown
+                stats[name]["nulls"] = None
+                bounds[name] = None
+                continue
+
+            stats[name]["nulls"] += s.null_count
+            if stats[name]["dtype"] in ("int", "float") and s.has_min_max:
+                lo, hi = bounds.get(name, (s.min, s.max))
+                bounds[name] = (min(lo, s.min), max(hi, s.max))
+
+    for name, bound in bounds.items():
+        if bound is not None:
+            stats[name]["min"], stats[name]["max"] = float(bound[0]), float(bound[1])
+    return stats
+
+
+def _kind(arrow_type):
+    """Same dtype names as the CSV profiler's ColumnStats."""
+    pa = _pyarrow()
+    if pa.types.is_boolean(arrow_type):
+        return "bool"
+    if pa.types.is_integer(arrow_type):
+        return "int"
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "float"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "string"
+    return str(arrow_type)
+
+
+def empty_frame(path):
+    """Zero-row DataFrame with the file's columns and pandas dtypes."""
+    schema = read_metadata(path)["schema"]
+    return schema.empty_table().to_pandas()
+
+
+# ---------------- DATA ----------------
+
+def read_columns(path, columns):
+    """Only `columns` are read (memory-mapped where the format allows)."""
+    _pyarrow()
+
+    if columnar_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        import pyarrow.feather as feather
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def iter_batches(path, columns, batch_rows):
+    """DataFrames of `columns`, at most batch_rows each for Parquet."""
+    pa = _pyarrow()
+
+    if columnar_format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        # IPC batches keep the sizes they were written with
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).select(columns).to_pandas()
@@ -0,0 +1,300 @@
+import os
+import glob
+import time
+import struct
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
+TEXT_EXTENSIONS = {".txt", ".md", ".jsonl", ".tsv"}
+
+# Bytes read per text file; larger files are counted on this prefix
+TEXT_SAMPLE_BYTES = 1024 * 1024
+
+# Files per thread pool task
+BATCH_FILES = 64
+
+# Most common image sizes listed in the profile
+TOP_SIZES = 5
+
+
+def is_glob(path):
+    return any(ch in path for ch in "*?[")
+
+
+class CorpusProfiler:
+    """
+    Profiles a directory (or glob) of image / text files.
+
+    - files are listed with os.scandir, then at most max_files of them,
+      spread evenly over the listing, are profiled
+    - a thread pool reads headers only: image format and dimensions
+      from the first bytes, line and token counts from a bounded prefix
+      of each text file
+    - profiling stops once the time budget is spent; totals are then
+      extrapolated from the files profiled so far
+    """
+
+    def __init__(self, max_files=5000, time_budget_s=30.0, workers=None):
+        self.max_files = max_files
+        self.time_budget_s = time_budget_s
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+
+    # ---------------- PUBLIC ----------------
+
+    def profile(self, path):
+        started = time.monotonic()
+        files = self.list_files(path)
+        sample = self._spread(files)
+
+        images, texts = ImageStats(), TextStats()
+        deadline = started + self.time_budget_s
+        # Strided batches: if the budget runs out, the files profiled
+        # still cover the whole listing, not just its head
+        n_batches = -(-len(sample) // BATCH_FILES)
+        batches = [sample[i::n_batches] for i in range(n_batches)]
+
+        # Batches, not one future per file: 100k futures cost more than the reads
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for results in pool.map(_profile_batch, batches, [deadline] * len(batches)):
+                for kind, info in results:
+                    (images if kind == "image" else texts).update(info)
+
+        profiled = images.count + texts.count
+        exhausted = profiled < len(sample)
+
+        # Totals scale up per kind from the files actually profiled
+        kinds = Counter(_kind(f) for f in files)
+        image_scale = kinds["image"] / images.count if images.count else 0.0
+        text_scale = kinds["text"] / texts.count if texts.count else 0.0
+        size = images.bytes * image_scale + texts.bytes * text_scale
+
+        return {
+            "files": len(files),
+            "image_files": kinds["image"],
+            "text_files": kinds["text"],
+            "size_mb": round(size / (1024 * 1024), 2),
+            "image_stats": images.summary() if images.count else None,
+            "text_stats": texts.summary(text_scale) if texts.count else None,
+            "profile": {
+                "mode": "corpus",
+                "files_profiled": profiled,
+                "sample_fraction": round(profiled / len(files), 4) if files else 0.0,
+                "budget_exhausted": exhausted,
+                "workers": self.workers,
+                "elapsed_s": round(time.monotonic() - started, 3)
+            }
+        }
+
+    def list_files(self, path):
+        """Image and text files under a directory or matching a glob, sorted."""
+        if os.path.isdir(path):
+            candidates = _walk(path)
+        else:
+            candidates = glob.iglob(path, recursive=True)
+        return sorted(f for f in candidates if _kind(f))
+
+    # ---------------- HELPERS ----------------
+
+    def _spread(self, files):
+        if len(files) <= self.max_files:
+            return files
+        step = len(files) / self.max_files
+        return [files[int(i * step)] for i in range(self.max_files)]
+
+
+def _walk(root):
+    # Iterative scandir: no per-entry stat, no recursion limit
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+
+
+def _kind(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return "image"
+    if ext in TEXT_EXTENSIONS:
+        return "text"
+    return None
+
+
+def _profile_batch(paths, deadline):
+    results = []
+    for path in paths:
+        if time.monotonic() > deadline:
+            break
+        results.append(_profile_file(path))
+    return results
+
+
+def _profile_file(path):
+    kind = _kind(path)
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if kind == "image":
+                fmt, width, height = image_header(f)
+                return kind, {"bytes": size, "format": fmt, "width": width, "height": height}
+            head = f.read(TEXT_SAMPLE_BYTES)
+
+        return kind, {
+            "bytes": size,
+            "sampled_bytes": len(head),
+            "lines": head.count(b"\n") + (1 if head and not head.endswith(b"\n") else 0),
+            "tokens": len(head.split())
+        }
+    except (OSError, struct.error):
+        # Unreadable, or an image header cut short
+        return kind, {"bytes": 0, "error": True}
+
+
+# ---------------- IMAGE HEADERS ----------------
+
+def image_header(f):
+    """(format, width, height) from the file header; dims None if unknown."""
+    head = f.read(32)
+
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        width, height = struct.unpack(">II", head[16:24])
+        return "png", width, height
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        width, height = struct.unpack("<HH", head[6:10])
+        return "gif", width, height
+    if head[:2] == b"BM":
+        width, height = struct.unpack("<ii", head[18:26])
+        return "bmp", width, abs(height)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ("webp",) + _webp_size(head, f)
+    if head[:2] == b"\xff\xd8":
+        f.seek(2)
+        return ("jpeg",) + _jpeg_size(f)
+    return "unknown", None, None
+
+
+def _webp_size(head, f):
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        data = head[24:30] if len(head) >= 30 else head[24:] + f.read(30 - len(head))
+        width = int.from_bytes(data[0:3], "little") + 1
+        height = int.from_bytes(data[3:6], "little") + 1
+        return width, height
+    if chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    return None, None
+
+
+def _jpeg_size(f):
+    """Walks marker segments (skipping EXIF etc.) to the first SOF frame."""
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None, None
+        code = marker[1]
+        if code == 0xFF:
+            f.seek(-1, os.SEEK_CUR)  # fill byte
+            continue
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue  # markers without a length
+
+        length = f.read(2)
+        if len(length) < 2:
+            return None, None
+        seg_len = struct.unpack(">H", length)[0]
+
+        # SOF0..SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) < 5:
+                return None, None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+        f.seek(seg_len - 2, os.SEEK_CUR)
+
+
+# ---------------- AGGREGATES ----------------
+
+class ImageStats:
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.errors = 0
+        self.formats = Counter()
+        self.sizes = Counter()
+        self.widths = []
+        self.heights = []
+
+    def update(self, info):
+        self.count += 1
+        self.bytes += info["bytes"]
+        if info.get("error"):
+            self.errors += 1
+            return
+
+        self.formats[info["format"]] += 1
+        if info["width"] and info["height"]:
+            self.widths.append(info["width"])
+            self.heights.append(info["height"])
+            self.sizes[f"{info['width']}x{info['height']}"] += 1
+
+    def summary(self):
+        out = {
+            "profiled": self.count,
+            "unreadable": self.errors,
+            "formats": dict(self.formats),
+            "common_sizes": dict(self.sizes.most_common(TOP_SIZES))
+        }
+        if self.widths:
+            out["width"] = _range(self.widths)
+            out["height"] = _range(self.heights)
+        return out
+
+
+class TextStats:
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.errors = 0
+        self.sampled_bytes = 0
+        self.lines = 0
+        self.tokens = 0
+        self.truncated = 0
+
+    def update(self, info):
+        self.count += 1
+        self.bytes += info["bytes"]
+        if info.get("error"):
+            self.errors += 1
+            return
+
+        # Counts from a prefix are scaled up to the whole file
+        ratio = info["bytes"] / info["sampled_bytes"] if info["sampled_bytes"] else 1.0
+        if ratio > 1:
+            self.truncated += 1
+        self.sampled_bytes += info["sampled_bytes"]
+        self.lines += info["lines"] * ratio
+        self.tokens += info["tokens"] * ratio
+
+    def summary(self, scale):
+        return {
+            "profiled": self.count,
+            "unreadable": self.errors,
+            "estimated_lines": int(self.lines * scale),
+            "estimated_tokens": int(self.tokens * scale),
+            "tokens_per_file": round(self.tokens / self.count, 1),
+            "files_truncated": self.truncated,
+            "estimated": scale > 1 or self.truncated > 0
+        }
+
+
+def _range(values):
+    return {"min": min(values), "max": max(values), "mean": round(sum(values) / len(values), 1)}
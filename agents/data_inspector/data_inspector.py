@@ -1,17 +1,54 @@
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
 import os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
 import json
+import time
 import pandas as pd
 
+from agents.data_inspector.profiler import FastProfiler
+from agents.data_inspector.corpus import CorpusProfiler, is_glob
+from agents.columnar import columnar_format, read_metadata
+
+# CSVs above this size are profiled with the fast (sampling) profiler
+FAST_PROFILE_MB = 256
+
+
 class DataInspectorAgent:
+    def __init__(self, fast=None, time_budget_s=30.0, memory_budget_mb=256, max_files=5000):
+        # fast=None picks the profiler from the file size
+        self.fast = fast
+        self.time_budget_s = time_budget_s
+        self.memory_budget_mb = memory_budget_mb
+        # Files profiled per directory / glob dataset
+        self.max_files = max_files
+
     def run(self, spec_path, dataset_path=None):
 
-        if not dataset_path or not os.path.exists(dataset_path):
+        if not dataset_path:
+            return self.emit_no_data()
+
+        # Directories and globs of image / text files; a path that exists
+        # is never globbed (sales[2024].csv is a file name)
+        if os.path.isdir(dataset_path) or (
+            not os.path.exists(dataset_path) and is_glob(dataset_path)
+        ):
+            return self.inspect_corpus(dataset_path)
+
+        if not os.path.exists(dataset_path):
             return self.emit_no_data()
 
         ext = os.path.splitext(dataset_path)[1].lower()
 
         if ext == ".csv":
+            if self._use_fast(dataset_path):
+                return self.inspect_csv_fast(dataset_path)
             return self.inspect_csv(dataset_path)
+        elif columnar_format(dataset_path):
+            return self.inspect_columnar(dataset_path)
         elif ext in [".jpg", ".png", ".jpeg"]:
             return self.emit_simple("image", dataset_path)
         elif ext == ".txt":
@@ -37,6 +74,80 @@ class DataInspectorAgent:
             "size_mb": round(size_mb, 2)
         }
 
+    def inspect_csv_fast(self, path):
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        profile = FastProfiler(
+            time_budget_s=self.time_budget_s,
+            memory_budget_mb=self.memory_budget_mb
+        ).profile(path)
+
+        target = self.detect_target(profile["first_chunk"])
+
+        return {
+            "data_present": True,
+            "modality": "tabular",
+            "rows": profile["rows"],
+            "columns": len(profile["columns"]),
+            "column_names": profile["columns"],
+            "target_detected": target is not None,
+            "target_column": target,
+            "size_mb": round(size_mb, 2),
+            "column_stats": profile["column_stats"],
+            "profile": profile["profile"]
+        }
+
+    def inspect_columnar(self, path):
+        """Parquet / Feather / Arrow: profiled from file metadata only."""
+        started = time.monotonic()
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        meta = read_metadata(path)
+
+        target = self.detect_target(meta["schema"].empty_table().to_pandas())
+
+        return {
+            "data_present": True,
+            "modality": "tabular",
+            "rows": meta["rows"],
+            "columns": len(meta["columns"]),
+            "column_names": meta["columns"],
+            "target_detected": target is not None,
+            "target_column": target,
+            "size_mb": round(size_mb, 2),
+            "column_stats": meta["column_stats"],
+            "profile": {
+                "mode": "metadata",
+                "format": meta["format"],
+                "batches": meta["batches"],
+                "elapsed_s": round(time.monotonic() - started, 3)
+            }
+        }
+
+    def inspect_corpus(self, path):
+        profile = CorpusProfiler(
+            max_files=self.max_files,
+            time_budget_s=self.time_budget_s
+        ).profile(path)
+
+        if not profile["files"]:
+            return self.emit_no_data()
+
+        if profile["image_files"] and profile["text_files"]:
+            modality = "mixed"
+        else:
+            modality = "image" if profile["image_files"] else "text"
+
+        return {
+            "data_present": True,
+            "modality": modality,
+            **profile
+        }
+
+    def _use_fast(self, path):
+        if self.fast is not None:
+            return self.fast
+        return os.path.getsize(path) / (1024 * 1024) > FAST_PROFILE_MB
+
     def detect_target(self, df):
         for col in ["label", "target", "class", "y"]:
             if col in df.columns:
@@ -62,7 +173,7 @@ class DataInspectorAgent:
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
 
     if len(sys.argv) < 2:
         print(
@@ -72,13 +183,32 @@ if __name__ == "__main__":
             "Examples:\n"
             "  python data_inspector.py project_spec_v1.json\n"
             "  python data_inspector.py project_spec_v1.json data.csv\n"
+            "  python data_inspector.py project_spec_v1.json data.parquet\n"
+            "  python data_inspector.py project_spec_v1.json images/ --max-files 2000\n"
+            "  python data_inspector.py project_spec_v1.json 'shards/**/*.txt'\n"
+            "  python data_inspector.py project_spec_v1.json big.csv --fast --time-budget 10\n"
         )
         sys.exit(1)
 
-    spec = sys.argv[1]
-    data = sys.argv[2] if len(sys.argv) > 2 else None
-
-    output = DataInspectorAgent().run(spec, data)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("spec")
+    parser.add_argument("data", nargs="?")
+    parser.add_argument("--fast", action="store_true", default=None,
+                        help="Force the sampling profiler")
+    parser.add_argument("--time-budget", type=float, default=30.0,
+                        help="Seconds the fast profiler may spend")
+    parser.add_argument("--memory-budget", type=int, default=256,
+                        help="MB of CSV the fast profiler may parse")
+    parser.add_argument("--max-files", type=int, default=5000,
+                        help="Files profiled in a directory / glob dataset")
+    args = parser.parse_args()
+
+    output = DataInspectorAgent(
+        fast=args.fast,
+        time_budget_s=args.time_budget,
+        memory_budget_mb=args.memory_budget,
+        max_files=args.max_files
+    ).run(args.spec, args.data)
 
     with open("data_profile_v1.json", "w") as f:
         json.dump(output, f, indent=2)
@@ -0,0 +1,260 @@
+import io
+import os
+import time
+import numpy as np
+import pandas as pd
+
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+
+# Evenly spaced blocks read when sampling a file over the memory budget
+SAMPLE_BLOCKS = 64
+
+# Distinct values tracked per column before reporting a lower bound
+CARDINALITY_CAP = 10_000
+
+
+class FastProfiler:
+    """
+    Single-pass CSV profiler for inputs too large to load.
+
+    - rows come from a raw newline count over the file bytes: an upper
+      bound when quoted cells contain newlines
+    - column stats come from a streaming pass over the file, or from
+      evenly spaced blocks when the file exceeds the memory budget;
+      the same byte scan tracks quote parity, so each block starts and
+      ends on a row boundary even inside multi-line quoted cells
+    - the pass stops early once the time budget is spent
+    """
+
+    def __init__(self, time_budget_s=30.0, memory_budget_mb=256):
+        self.time_budget_s = time_budget_s
+        self.memory_budget_mb = memory_budget_mb
+
+    # ---------------- PUBLIC ----------------
+
+    def profile(self, path):
+        started = time.monotonic()
+        size = os.path.getsize(path)
+
+        header = pd.read_csv(path, nrows=0)
+        columns = list(header.columns)
+
+        budget_bytes = self.memory_budget_mb * 1024 * 1024
+        skipped = []
+        if size <= budget_bytes:
+            rows, _ = self._scan(path)
+            chunks = self._stream_chunks(path)
+            method = "streaming_pass"
+        else:
+            offsets = self._block_offsets(path, size, budget_bytes)
+            rows, in_quotes = self._scan(path, [start for start, _ in offsets])
+            chunks = self._sample_blocks(path, columns, offsets, in_quotes, skipped)
+            method = "block_sample"
+
+        stats = {col: ColumnStats() for col in columns}
+        first_chunk = None
+        sampled = 0
+        exhausted = False
+
+        for chunk in chunks:
+            if first_chunk is None:
+                first_chunk = chunk
+            for col in columns:
+                stats[col].update(chunk[col])
+            sampled += len(chunk)
+
+            if time.monotonic() - started > self.time_budget_s:
+                exhausted = True
+                break
+
+        return {
+            "rows": rows,
+            "columns": columns,
+            "first_chunk": first_chunk if first_chunk is not None else header,
+            "column_stats": {col: s.summary() for col, s in stats.items()},
+            "profile": {
+                "mode": "fast",
+                "rows_method": "byte_scan",
+                "rows_upper_bound": True,
+                "stats_method": method,
+                "skipped_blocks": len(skipped),
+                "sampled_rows": sampled,
+                "sample_fraction": round(sampled / rows, 4) if rows else 0.0,
+                "budget_exhausted": exhausted,
+                "elapsed_s": round(time.monotonic() - started, 3)
+            }
+        }
+
+    def count_rows(self, path):
+        """
+        Data rows = raw newlines minus the header line. Newlines inside
+        quoted fields are counted too, so this is only an upper bound
+        for CSVs with multi-line text cells.
+        """
+        return self._scan(path)[0]
+
+    def _scan(self, path, offsets=()):
+        """
+        One pass over the bytes: count_rows, plus for each offset
+        (ascending) whether it lies inside a quoted field, i.e. after
+        an odd number of '"' (an escaped "" counts twice).
+        """
+        newlines = 0
+        quotes = 0
+        in_quotes = []
+        pending = list(offsets)
+        position = 0
+        last = b"\n"
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(SCAN_BLOCK_BYTES)
+                if not block:
+                    break
+                while pending and pending[0] < position + len(block):
+                    cut = pending.pop(0) - position
+                    in_quotes.append(bool((quotes + block[:cut].count(b'"')) % 2))
+                newlines += block.count(b"\n")
+                quotes += block.count(b'"')
+                position += len(block)
+                last = block[-1:]
+
+        in_quotes.extend(bool(quotes % 2) for _ in pending)
+        if last != b"\n":
+            newlines += 1
+        return max(newlines - 1, 0), in_quotes
+
+    # ---------------- SOURCES ----------------
+
+    def _chunk_rows(self, path):
+        # Rough bytes/row from the head of the file, to size chunks
+        with open(path, "rb") as f:
+            head = f.read(1024 * 1024)
+        row_bytes = max(len(head) / max(head.count(b"\n"), 1), 1)
+
+        # A parsed chunk costs a few times its raw size
+        chunk_bytes = self.memory_budget_mb * 1024 * 1024 / 8
+        return max(int(chunk_bytes / row_bytes), 1000)
+
+    def _stream_chunks(self, path):
+        yield from pd.read_csv(path, chunksize=self._chunk_rows(path))
+
+    def _block_offsets(self, path, size, budget_bytes):
+        """(start, length) of budget_bytes worth of evenly spaced blocks."""
+        block_bytes = max(budget_bytes // (SAMPLE_BLOCKS * 8), 64 * 1024)
+        stride = size // SAMPLE_BLOCKS
+
+        with open(path, "rb") as f:
+            end = len(f.readline())  # header
+
+        offsets = []
+        for i in range(SAMPLE_BLOCKS):
+            start = max(i * stride, end)
+            if start >= size:
+                break
+            offsets.append((start, block_bytes))
+            end = start + block_bytes
+        return offsets
+
+    def _sample_blocks(self, path, columns, offsets, in_quotes, skipped):
+        """
+        Reads the blocks, trimmed to whole rows, so the sample covers
+        the whole file rather than just its head. A row boundary is a
+        newline outside quotes: the parity of '"' from the block start,
+        seeded with in_quotes from the byte scan. Blocks that still fail
+        to parse (malformed quoting) are appended to `skipped`; if no
+        block yields rows, falls back to the streaming pass.
+        """
+        sampled = False
+        with open(path, "rb") as f:
+            for i, ((start, length), quoted) in enumerate(zip(offsets, in_quotes)):
+                f.seek(start)
+                block = f.read(length)
+
+                raw = np.frombuffer(block, dtype=np.uint8)
+                parity = (np.cumsum(raw == ord('"')) + quoted) % 2
+                ends = np.flatnonzero((raw == ord("\n")) & (parity == 0))
+
+                # The first block starts right after the header; the others
+                # drop the partial row they start in
+                if not len(ends):
+                    continue
+                begin = 0 if i == 0 else ends[0] + 1
+                rows = block[begin:ends[-1] + 1]
+                if not rows:
+                    continue
+
+                try:
+                    chunk = pd.read_csv(io.BytesIO(rows), header=None, names=columns)
+                except pd.errors.ParserError:
+                    skipped.append(i)
+                    continue
+                sampled = True
+                yield chunk
+
+        if not sampled:
+            yield from self._stream_chunks(path)
+
+
+class ColumnStats:
+    """Mergeable per-column statistics, updated one chunk at a time."""
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.kind = None
+        self.min = None
+        self.max = None
+        self.sum = 0.0
+        self.numeric_count = 0
+        self.distinct = set()
+        self.capped = False
+
+    def update(self, series):
+        self.count += len(series)
+        self.nulls += int(series.isna().sum())
+        self.kind = self._merge_kind(self.kind, series)
+
+        values = series.dropna()
+        if len(values) and self.kind in ("int", "float"):
+            self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+            self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+            self.sum += float(values.sum())
+            self.numeric_count += len(values)
+
+        if not self.capped:
+            self.distinct.update(values.unique()[:CARDINALITY_CAP])
+            if len(self.distinct) >= CARDINALITY_CAP:
+                self.capped = True
+                self.distinct = set()
+
+    def summary(self):
+        out = {
+            "dtype": self.kind or "empty",
+            "null_rate": round(self.nulls / self.count, 4) if self.count else 0.0,
+            "cardinality": CARDINALITY_CAP if self.capped else len(self.distinct),
+            "cardinality_capped": self.capped
+        }
+        if self.kind in ("int", "float") and self.numeric_count:
+            out["min"] = self.min
+            out["max"] = self.max
+            out["mean"] = self.sum / self.numeric_count
+        return out
+
+    def _merge_kind(self, current, series):
+        if series.isna().all():
+            return current
+
+        if pd.api.types.is_bool_dtype(series):
+            kind = "bool"
+        elif pd.api.types.is_integer_dtype(series):
+            kind = "int"
+        elif pd.api.types.is_float_dtype(series):
+            kind = "float"
+        else:
+            kind = "string"
+
+        if current is None or current == kind:
+            return kind
+        if {current, kind} == {"int", "float"}:
+            return "float"
+        return "string"
@@ -1,7 +1,14 @@
-import json
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
 import os
-import re
-from google import genai
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+import json
+
+from agents.llm_gateway import get_gateway
+from agents.plans import load_plan
 
 
 class FrontendBuilderAgent:
@@ -12,22 +19,15 @@ class FrontendBuilderAgent:
     """
 
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("❌ GEMINI_API_KEY not set")
-
-        self.client = genai.Client(api_key=api_key)
+        self.llm = get_gateway()
         self.model = "models/gemini-2.5-flash"
 
     # ---------------- PUBLIC ----------------
 
     def run(self, app_plan_path, output_root="generated_projects"):
-        index_path = os.path.join(output_dir, "index.html")
-
-        if os.path.exists(index_path):
-          print("ℹ Frontend already generated, skipping")
-          return
-        plan = self._load(app_plan_path)
+        # Reuse of a previous build is decided by the orchestrator's
+        # build cache, which also notices when the plan changed
+        plan = load_plan(app_plan_path)
 
         project_slug = self._project_slug(plan)
         output_dir = os.path.join(
@@ -75,16 +75,13 @@ FAIL CONDITIONS:
 """
 
         for attempt in range(3):
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
-
-            html = response.text.strip()
+            html = self.llm.generate(self.model, prompt).strip()
 
             if self._is_valid_html(html):
                 return html
 
+            # Don't let the cache serve the same bad page on retry
+            self.llm.forget(self.model, prompt)
             print(f"⚠️ Invalid HTML (attempt {attempt + 1}/3), retrying...")
 
         raise RuntimeError("❌ Failed to generate valid HTML after 3 attempts")
@@ -120,14 +117,8 @@ FAIL CONDITIONS:
         with open(path, "w", encoding="utf-8") as f:
             f.write(html)
 
-    def _load(self, path):
-        with open(path) as f:
-            return json.load(f)
-
 
 if __name__ == "__main__":
-    import sys
-
     FrontendBuilderAgent().run(
         app_plan_path=sys.argv[1]
     )
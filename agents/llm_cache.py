@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_PATH = os.getenv(
+    "AUTODEV_LLM_CACHE",
+    os.path.join(BASE_DIR, ".autodev_cache", "llm_cache.sqlite")
+)
+DEFAULT_TTL_S = float(os.getenv("AUTODEV_LLM_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_BYTES = int(os.getenv("AUTODEV_LLM_CACHE_MAX_MB", 256)) * 1024 * 1024
+
+
+def normalize_prompt(contents):
+    """Whitespace-insensitive form of a prompt, used only for the key."""
+    if not isinstance(contents, str):
+        contents = json.dumps(contents, sort_keys=True, default=str)
+    return " ".join(contents.split())
+
+
+class LLMCache:
+    """
+    SQLite-backed LLM response cache.
+    - key: model name + normalized prompt hash (+ request config)
+    - entries expire after ttl_s
+    - least recently used entries are evicted past max_bytes
+    Safe to share between threads and between processes.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_s=DEFAULT_TTL_S, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                text TEXT,
+                size INTEGER,
+                created_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)"
+        )
+        self.db.commit()
+
+    # ---------------- PUBLIC ----------------
+
+    def key(self, model, contents, config=None):
+        h = hashlib.sha256()
+        h.update(model.encode())
+        h.update(b"\0")
+        h.update(normalize_prompt(contents).encode())
+        if config:
+            h.update(b"\0")
+            h.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT text, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] <= self.ttl_s:
+                self.db.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self.db.commit()
+                self.hits += 1
+                return row[0]
+
+            if row:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key, model, text):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, text, len(text.encode()), now, now)
+            )
+            self._evict()
+            self.db.commit()
+
+    def delete(self, key):
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+
+    def stats(self):
+        with self.lock:
+            entries, size = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size
+        }
+
+    # ---------------- EVICTION ----------------
+
+    def _evict(self):
+        self.db.execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_s,)
+        )
+
+        total = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self.db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_cache():
+    """One cache (and SQLite connection) per process."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
+
+
+def shared_stats():
+    """Counters of this process's cache, or None if nothing used it."""
+    return _shared_cache.stats() if _shared_cache else None
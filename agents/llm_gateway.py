@@ -0,0 +1,381 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.llm_cache import get_cache
+from agents.metrics import REGISTRY
+
+MAX_CONCURRENCY = int(os.getenv("AUTODEV_LLM_CONCURRENCY", 8))
+TIMEOUT_S = float(os.getenv("AUTODEV_LLM_TIMEOUT_S", 120))
+
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total", "LLM requests by outcome (api, cache, error)", ("model", "source")
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "llm_call_seconds", "Latency of LLM API calls, excluding cache hits", ("model",)
+)
+LLM_FIRST_TOKEN = REGISTRY.histogram(
+    "llm_first_token_seconds", "Time to the first streamed chunk", ("model",)
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the LLM API", ("model", "kind")
+)
+
+
+class LLMGateway:
+    """
+    The one LLM entry point for every agent in a process.
+
+    - one genai.Client, so its HTTP connection pool is reused
+    - a global cap on in-flight calls: one semaphore shared by sync
+      callers and every event loop (async callers wait on it in a thread)
+    - per-call timeouts covering the slot wait and the API call; a sync
+      call runs on a worker thread so the caller can stop waiting
+    - responses served from / stored in the on-disk LLM cache; async
+      callers do the SQLite I/O off the event loop
+    """
+
+    def __init__(self, client, cache=None, max_concurrency=MAX_CONCURRENCY,
+                 timeout_s=TIMEOUT_S):
+        self.client = client
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Sync API calls; every running call holds a slot, so this many
+        # threads always suffice
+        self._calls = ThreadPoolExecutor(max_concurrency, thread_name_prefix="llm")
+
+    # ---------------- ASYNC ----------------
+
+    async def agenerate(self, model, contents, timeout_s=None, **kwargs):
+        key, text = await self._alookup(model, contents, kwargs)
+        if text is not None:
+            return text
+
+        async with self._async_slot(timeout_s):
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self.client.aio.models.generate_content(
+                        model=model, contents=contents, **kwargs
+                    ),
+                    timeout=timeout_s or self.timeout_s
+                )
+            except Exception:
+                LLM_CALLS.inc(model=model, source="error")
+                raise
+            self._record(model, response, time.perf_counter() - started)
+
+        if key is None:
+            return self._store(key, model, response)
+        return await asyncio.to_thread(self._store, key, model, response)
+
+    async def astream(self, model, contents, timeout_s=None, **kwargs):
+        """
+        Yields text chunks as the model produces them. A cached response
+        comes back as one chunk; a complete stream is cached like
+        agenerate's responses.
+        """
+        key, text = await self._alookup(model, contents, kwargs)
+        if text is not None:
+            yield text
+            return
+
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        parts = []
+        last = None
+
+        async with self._async_slot(timeout_s):
+            started = time.perf_counter()
+            try:
+                stream = await asyncio.wait_for(
+                    self.client.aio.models.generate_content_stream(
+                        model=model, contents=contents, **kwargs
+                    ),
+                    timeout=deadline - time.monotonic()
+                )
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        last = await asyncio.wait_for(
+                            chunks.__anext__(), timeout=deadline - time.monotonic()
+                        )
+                    except StopAsyncIteration:
+                        break
+
+                    if not parts:
+                        LLM_FIRST_TOKEN.observe(time.perf_counter() - started, model=model)
+                    if last.text:
+                        parts.append(last.text)
+                        yield last.text
+            except Exception:
+                LLM_CALLS.inc(model=model, source="error")
+                raise
+
+            # Usage metadata arrives with the final chunk
+            self._record(model, last, time.perf_counter() - started)
+
+        text = "".join(parts)
+        if key and text:
+            await asyncio.to_thread(self.cache.put, key, model, text)
+
+    @contextlib.asynccontextmanager
+    async def _async_slot(self, timeout_s):
+        if not self._slots.acquire(blocking=False):
+            waiter = asyncio.ensure_future(asyncio.to_thread(
+                self._slots.acquire, timeout=timeout_s or self.timeout_s
+            ))
+            try:
+                acquired = await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                # The thread may still get the slot: hand it straight back
+                waiter.add_done_callback(self._release_if_acquired)
+                raise
+            if not acquired:
+                raise TimeoutError("LLM gateway: no free slot")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _release_if_acquired(self, waiter):
+        if not waiter.cancelled() and waiter.exception() is None and waiter.result():
+            self._slots.release()
+
+    async def _alookup(self, model, contents, kwargs):
+        if self.cache is None:
+            return None, None
+        return await asyncio.to_thread(self._lookup, model, contents, kwargs)
+
+    # ---------------- SYNC ----------------
+
+    def generate(self, model, contents, timeout_s=None, **kwargs):
+        key, text = self._lookup(model, contents, kwargs)
+        if text is not None:
+            return text
+
+        if not self._slots.acquire(timeout=timeout_s or self.timeout_s):
+            raise TimeoutError("LLM gateway: no free slot")
+        started = time.perf_counter()
+        try:
+            call = self._calls.submit(
+                self.client.models.generate_content,
+                model=model, contents=contents, **kwargs
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        # A call past its deadline keeps its slot until it really ends
+        call.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            response = call.result(timeout=timeout_s or self.timeout_s)
+        except TimeoutError:
+            LLM_CALLS.inc(model=model, source="error")
+            raise TimeoutError("LLM gateway: call timed out") from None
+        except Exception:
+            LLM_CALLS.inc(model=model, source="error")
+            raise
+
+        self._record(model, response, time.perf_counter() - started)
+        return self._store(key, model, response)
+
+    # ---------------- CACHE ----------------
+
+    def forget(self, model, contents, config=None):
+        """Drop a cached response the caller found unusable."""
+        if self.cache is not None:
+            self.cache.delete(self.cache.key(model, contents, config))
+
+    def _lookup(self, model, contents, kwargs):
+        if self.cache is None:
+            return None, None
+        key = self.cache.key(model, contents, kwargs.get("config"))
+        text = self.cache.get(key)
+        if text is not None:
+            LLM_CALLS.inc(model=model, source="cache")
+        return key, text
+
+    def _record(self, model, response, elapsed):
+        LLM_CALLS.inc(model=model, source="api")
+        LLM_SECONDS.observe(elapsed, model=model)
+
+        usage = getattr(response, "usage_metadata", None)
+        for kind, field in (("prompt", "prompt_token_count"),
+                            ("output", "candidates_token_count")):
+            count = getattr(usage, field, None) if usage else None
+            if count:
+                LLM_TOKENS.inc(count, model=model, kind=kind)
+
+    def _store(self, key, model, response):
+        text = response.text or ""
+        if key and text:
+            self.cache.put(key, model, text)
+        return text
+
+
+# ============================================================
+# FAKE LLM (OFFLINE)
+# ============================================================
+class FakeLLM:
+    """
+    Offline stand-in with the genai.Client surface the gateway uses.
+    Replies are canned per prompt kind and valid for each agent;
+    `responses` maps prompt substrings to custom replies.
+    """
+
+    def __init__(self, responses=None, latency_s=0.0):
+        self.responses = responses or {}
+        self.latency_s = latency_s
+        self.calls = 0
+        self.models = _FakeModels(self)
+        self.aio = _FakeAio(self)
+
+    def reply(self, contents):
+        self.calls += 1
+        prompt = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+
+        for needle, text in self.responses.items():
+            if needle in prompt:
+                return text
+
+        if "FastAPI backend" in prompt:
+            return FAKE_BACKEND
+        if "SINGLE-PAGE HTML" in prompt:
+            return FAKE_HTML
+        if "why_ai" in prompt:
+            return json.dumps({
+                "why_ai": "fake", "why_task": "fake", "why_model": "fake",
+                "risks": [], "confidence": 0.5
+            })
+        return json.dumps({
+            "status": "draft",
+            "current_plan": {"app_type": "website", "pages": ["Home"], "ai_features": []},
+            "suggested_features": [],
+            "questions": ["What should the site be called?"]
+        })
+
+
+class _FakeResponse:
+    def __init__(self, text, prompt=""):
+        self.text = text
+        # Word counts stand in for tokens so metrics have something to show
+        self.usage_metadata = _FakeUsage(len(prompt.split()), len(text.split()))
+
+
+class _FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class _FakeModels:
+    def __init__(self, fake):
+        self.fake = fake
+
+    def generate_content(self, model, contents, **kwargs):
+        time.sleep(self.fake.latency_s)
+        return _FakeResponse(self.fake.reply(contents), str(contents))
+
+
+class _FakeAsyncModels:
+    def __init__(self, fake):
+        self.fake = fake
+
+    async def generate_content(self, model, contents, **kwargs):
+        await asyncio.sleep(self.fake.latency_s)
+        return _FakeResponse(self.fake.reply(contents), str(contents))
+
+    async def generate_content_stream(self, model, contents, **kwargs):
+        text = self.fake.reply(contents)
+        # A few words per chunk, latency spread over the stream
+        words = text.split(" ")
+        chunks = [" ".join(words[i:i + 4]) + " " for i in range(0, len(words), 4)]
+
+        async def stream():
+            for n, chunk in enumerate(chunks):
+                await asyncio.sleep(self.fake.latency_s / len(chunks))
+                last = n == len(chunks) - 1
+                yield _FakeResponse(chunk, str(contents) if last else "")
+        return stream()
+
+
+class _FakeAio:
+    def __init__(self, fake):
+        self.models = _FakeAsyncModels(fake)
+
+
+FAKE_BACKEND = """from fastapi import FastAPI
+
+app = FastAPI()
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+"""
+
+FAKE_HTML = """<!DOCTYPE html>
+<html>
+<head><title>AutoDev</title></head>
+<body>
+<nav><a href="#home">Home</a></nav>
+<section id="home"><h1>AutoDev</h1></section>
+</body>
+</html>
+"""
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """
+    Process-wide gateway.
+    AUTODEV_FAKE_LLM=1 serves FakeLLM replies (no key, no network);
+    otherwise GEMINI_API_KEY is required.
+    """
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = _build_gateway()
+        return _gateway
+
+
+def set_gateway(gateway):
+    """Install a gateway (e.g. one over FakeLLM) for tests and benchmarks."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = gateway
+
+
+def _build_gateway():
+    if os.getenv("AUTODEV_FAKE_LLM"):
+        # Canned replies never go into the real response cache
+        latency = float(os.getenv("AUTODEV_FAKE_LLM_LATENCY_MS", 0)) / 1000
+        return LLMGateway(FakeLLM(latency_s=latency), cache=None)
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError("❌ GEMINI_API_KEY not set")
+
+    cache = None if os.getenv("AUTODEV_LLM_CACHE_DISABLE") else get_cache()
+
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(timeout=int(TIMEOUT_S * 1000))
+    )
+    return LLMGateway(client, cache=cache)
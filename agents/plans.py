@@ -0,0 +1,12 @@
+import json
+
+
+def load_plan(source):
+    """
+    An agent input: a JSON file path, or the already-loaded dict that
+    in-process orchestrator runs pass instead of a path.
+    """
+    if isinstance(source, dict):
+        return source
+    with open(source) as f:
+        return json.load(f)
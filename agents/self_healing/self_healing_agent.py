@@ -1,3 +1,6 @@
+import subprocess
+
+
 class SelfHealingAgent:
     def run_with_healing(self, command):
         try:
@@ -1,15 +1,11 @@
-import os
 import json
-from google import genai
+
+from agents.llm_gateway import get_gateway
 
 
 class LLMReasoner:
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("GEMINI_API_KEY not set")
-
-        self.client = genai.Client(api_key=api_key)
+        self.llm = get_gateway()
 
     def explain(self, spec, data_profile, strategy):
         prompt = f"""
@@ -28,12 +24,7 @@ Explain in JSON ONLY with keys:
 why_ai, why_task, why_model, risks, confidence
 """
 
-        response = self.client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=prompt
-        )
-
-        text = response.text.strip()
+        text = self.llm.generate("gemini-1.5-flash", prompt).strip()
 
         # 🔐 HARD GUARANTEE: always return JSON
         try:
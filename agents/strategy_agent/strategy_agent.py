@@ -1,11 +1,28 @@
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
+import os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
 import json
-from llm_reasoner import LLMReasoner
+from agents.plans import load_plan
+from agents.strategy_agent.llm_reasoner import LLMReasoner
+
+# Above this many rows exact search makes /predict latency grow linearly
+APPROXIMATE_INDEX_ROWS = 1_000_000
+
+# All-items top-k table costs one query per row; skip it above this
+PRECOMPUTE_MAX_ROWS = 250_000
+
+# Above this size the trainer streams the CSV instead of loading it whole
+STREAMING_TRAINING_MB = 1024
 
 
 class StrategyAgent:
     def run(self, spec_path, data_profile_path, use_llm=True):
-        spec = self._load(spec_path)
-        data = self._load(data_profile_path)
+        spec = load_plan(spec_path)
+        data = load_plan(data_profile_path)
 
         # ---------- RULE-BASED CORE ----------
 
@@ -28,8 +45,11 @@ class StrategyAgent:
                 "model_family": "knn" if task_type == "recommendation" else "random_forest",
                 "hyperparameters": {
                     "n_neighbors": 3
-                }
-            }
+                },
+                "index": self._index_strategy(data),
+                "precompute_neighbors": self._precompute_strategy(data, task_type)
+            },
+            "training": self._training_strategy(data)
         }
 
         # ---------- LLM REASONING (SAFE + GUARANTEED) ----------
@@ -48,14 +68,30 @@ class StrategyAgent:
 
         return strategy
 
-    def _load(self, path):
-        with open(path) as f:
-            return json.load(f)
+    def _index_strategy(self, data):
+        """
+        Neighbour index for the trainer.
+        n_probe trades recall for latency on the approximate index.
+        """
+        if data.get("rows", 0) > APPROXIMATE_INDEX_ROWS:
+            return {"type": "ivf", "n_lists": None, "n_probe": 8}
+        return {"type": "auto"}
 
+    def _precompute_strategy(self, data, task_type):
+        """Item-to-item lookups for recommenders, if the table stays cheap."""
+        enabled = (
+            task_type == "recommendation"
+            and data.get("rows", 0) <= PRECOMPUTE_MAX_ROWS
+        )
+        return {"enabled": enabled, "k": 10}
 
-if __name__ == "__main__":
-    import sys
+    def _training_strategy(self, data):
+        if data.get("size_mb", 0) > STREAMING_TRAINING_MB:
+            return {"mode": "streaming", "chunksize": 100_000}
+        return {"mode": "in_memory"}
 
+
+if __name__ == "__main__":
     out = StrategyAgent().run(
         sys.argv[1],
         sys.argv[2],
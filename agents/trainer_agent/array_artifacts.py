@@ -0,0 +1,169 @@
+import os
+import json
+
+import numpy as np
+
+from agents.trainer_agent.neighbor_index import BruteIndex, IVFIndex
+
+# Model directory written by the trainer, served by backend/app.py
+ARRAYS_DIR = "model_arrays"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+class ArrayScaler:
+    """StandardScaler.transform over stored mean_ / scale_ arrays."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.n_features_in_ = len(mean)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def save_arrays(root, index, scaler, version, neighbors=None):
+    """
+    Writes the fitted index + scaler as raw .npy arrays and a manifest.
+
+    Array files carry the model version in their name and manifest.json
+    is replaced last, so a reader always sees one complete version.
+    Files of older versions are unlinked afterwards; processes that
+    still map them keep their pages until they reload.
+
+    Every index is stored as arrays. An sklearn kd_tree / ball_tree
+    (what "auto" resolves to below the IVF threshold) keeps its float64
+    rows as "data" plus its algorithm and leaf_size; load_arrays builds
+    the tree again over the mapped rows.
+
+    neighbors: optional (ids, distances) table from all_neighbors().
+    """
+    os.makedirs(root, exist_ok=True)
+
+    arrays = {
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+    }
+
+    if isinstance(index, IVFIndex):
+        arrays.update({
+            "data": index.data_,
+            "ivf_centroids": index.centroids_,
+            "ivf_offsets": index.offsets_,
+            "ivf_ids": index.ids_,
+        })
+        manifest_index = {"type": "ivf", "n_probe": int(index.n_probe)}
+    elif isinstance(index, BruteIndex) or getattr(index, "_fit_method", None) == "brute":
+        # sklearn NearestNeighbors keeps its fitted rows in _fit_X
+        arrays["data"] = index.data_ if isinstance(index, BruteIndex) else index._fit_X
+        manifest_index = {"type": "exact"}
+    else:
+        # The tree's own float64 copy: a rebuild over it maps, not copies
+        arrays["data"] = np.asarray(index._tree.data)
+        manifest_index = {
+            "type": "tree",
+            "algorithm": index._fit_method,
+            "leaf_size": int(index.leaf_size)
+        }
+
+    if neighbors is not None:
+        arrays["neighbor_ids"], arrays["neighbor_distances"] = neighbors
+
+    files = {}
+    for name, array in arrays.items():
+        files[name] = f"{name}-{version}.npy"
+        _write_array(os.path.join(root, files[name]), array)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_version": version,
+        "n_neighbors": int(index.n_neighbors),
+        "index": manifest_index,
+        "neighbors_k": int(neighbors[0].shape[1]) if neighbors is not None else None,
+        "files": files,
+    }
+
+    tmp = os.path.join(root, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(root, MANIFEST))
+
+    live = set(files.values()) | {MANIFEST}
+    for name in os.listdir(root):
+        if name.endswith(".npy") and name not in live:
+            os.remove(os.path.join(root, name))
+
+    return manifest
+
+
+def load_arrays(root, mmap=True):
+    """
+    Returns (index, scaler, manifest). With mmap=True the arrays are
+    mapped read-only: no unpickling, and every worker process shares
+    the same pages through the OS page cache. A tree index is rebuilt
+    in each process over the mapped rows: only its node arrays are
+    private.
+    """
+    with open(os.path.join(root, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported array artifact format: {manifest.get('format_version')}")
+
+    mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(root, file), mmap_mode=mode, allow_pickle=False)
+        for name, file in manifest["files"].items()
+        if not name.startswith("neighbor_")
+    }
+
+    # Small per-feature vectors: read into memory
+    scaler = ArrayScaler(np.array(arrays["scaler_mean"]), np.array(arrays["scaler_scale"]))
+
+    n_neighbors = manifest["n_neighbors"]
+    if manifest["index"]["type"] == "ivf":
+        index = IVFIndex.from_arrays(
+            np.array(arrays["ivf_centroids"]),
+            arrays["ivf_offsets"],
+            arrays["ivf_ids"],
+            arrays["data"],
+            n_neighbors=n_neighbors,
+            n_probe=manifest["index"]["n_probe"]
+        )
+    elif manifest["index"]["type"] == "tree":
+        # Imported here: serving exact / IVF arrays never needs sklearn
+        from sklearn.neighbors import NearestNeighbors
+
+        index = NearestNeighbors(
+            n_neighbors=n_neighbors,
+            algorithm=manifest["index"]["algorithm"],
+            leaf_size=manifest["index"]["leaf_size"]
+        ).fit(arrays["data"])
+    else:
+        index = BruteIndex(arrays["data"], n_neighbors=n_neighbors)
+
+    return index, scaler, manifest
+
+
+def load_neighbor_table(root, manifest):
+    """Mapped (ids, distances) item-to-item table, or None if not built."""
+    files = manifest["files"]
+    if "neighbor_ids" not in files:
+        return None
+    return tuple(
+        np.load(os.path.join(root, files[name]), mmap_mode="r", allow_pickle=False)
+        for name in ("neighbor_ids", "neighbor_distances")
+    )
+
+
+def _write_array(path, array):
+    tmp = path + ".tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=array.dtype, shape=array.shape)
+    # Copy in blocks so a memmapped training matrix is never fully loaded
+    step = 65536
+    for start in range(0, len(array), step):
+        out[start:start + step] = array[start:start + step]
+    out.flush()
+    del out
+    os.replace(tmp, path)
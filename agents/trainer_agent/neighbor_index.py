@@ -0,0 +1,274 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# model_strategy["index"]["type"] -> sklearn algorithm
+SKLEARN_ALGORITHMS = {
+    "auto": "auto",
+    "exact": "brute",
+    "kd_tree": "kd_tree",
+    "ball_tree": "ball_tree",
+}
+
+INDEX_TYPES = list(SKLEARN_ALGORITHMS) + ["ivf"]
+
+# Rows per block when computing distances, keeps temporaries bounded
+BLOCK_ROWS = 8192
+
+
+def build_index(X, index_config, n_neighbors):
+    """
+    Builds the neighbour index selected by model_strategy["index"].
+    Every index exposes the sklearn kneighbors() contract,
+    so backend/app.py does not care which one was built.
+    """
+    index_config = index_config or {}
+    index_type = index_config.get("type", "auto")
+
+    if index_type == "ivf":
+        return IVFIndex(
+            n_neighbors=n_neighbors,
+            n_lists=index_config.get("n_lists"),
+            n_probe=index_config.get("n_probe", 8),
+            n_iter=index_config.get("n_iter", 10),
+            random_state=index_config.get("random_state", 0)
+        ).fit(X)
+
+    # Imported here: serving mapped arrays never needs sklearn
+    from sklearn.neighbors import NearestNeighbors
+
+    if index_type not in SKLEARN_ALGORITHMS:
+        raise ValueError(
+            f"Unknown index type: {index_type} (expected one of {INDEX_TYPES})"
+        )
+
+    model = NearestNeighbors(
+        n_neighbors=n_neighbors,
+        algorithm=SKLEARN_ALGORITHMS[index_type]
+    )
+    model.fit(X)
+    return model
+
+
+def describe_index(index):
+    """Metadata entry recorded next to feature_count in model_metadata.json."""
+    if isinstance(index, BruteIndex):
+        return {"type": "exact"}
+    if isinstance(index, IVFIndex):
+        return {
+            "type": "ivf",
+            "n_lists": int(len(index.centroids_)),
+            "n_probe": int(index.n_probe)
+        }
+
+    algorithm = getattr(index, "_fit_method", index.algorithm)
+    return {"type": "exact" if algorithm == "brute" else algorithm}
+
+
+def all_neighbors(index, X, k, block_rows=BLOCK_ROWS, workers=None):
+    """
+    Top-k neighbours of every training row, excluding the row itself.
+
+    Rows are queried in blocks on a thread pool (the distance kernels
+    release the GIL). Returns int32 ids and float32 distances, both
+    shaped (n_rows, k).
+    """
+    n_rows = len(X)
+    k = min(k, n_rows - 1)
+    ids = np.empty((n_rows, k), dtype=np.int32)
+    distances = np.empty((n_rows, k), dtype=np.float32)
+
+    def run_block(start):
+        block = np.asarray(X[start:start + block_rows])
+        d, i = index.kneighbors(block, n_neighbors=k + 1)
+
+        # Move each row's own id (normally first) behind its neighbours
+        own = i == np.arange(start, start + len(block))[:, None]
+        keep = np.argsort(own, axis=1, kind="stable")[:, :k]
+
+        ids[start:start + len(block)] = np.take_along_axis(i, keep, axis=1)
+        distances[start:start + len(block)] = np.take_along_axis(d, keep, axis=1)
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        list(pool.map(run_block, range(0, n_rows, block_rows)))
+
+    return ids, distances
+
+
+def squared_distances(X, Y):
+    """Pairwise squared euclidean distances, clipped at zero."""
+    d = (
+        np.einsum("ij,ij->i", X, X)[:, None]
+        - 2.0 * (X @ Y.T)
+        + np.einsum("ij,ij->i", Y, Y)[None, :]
+    )
+    return np.maximum(d, 0.0, out=d)
+
+
+def top_k(d, k):
+    """Column ids of the k smallest entries per row, sorted."""
+    if d.shape[1] > k:
+        top = np.argpartition(d, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(d.shape[1]), d.shape).copy()
+    order = np.argsort(np.take_along_axis(d, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+class BruteIndex:
+    """
+    Exact search over a (possibly memory-mapped) training matrix.
+
+    Serves every sklearn index type once it is loaded from the array
+    artifact format: the fitted rows are all a tree needs to answer
+    exactly, and scanning them in blocks keeps a memmap on disk.
+    """
+
+    def __init__(self, data, n_neighbors=5):
+        self.data_ = data
+        self.n_neighbors = n_neighbors
+        self.n_samples_fit_ = len(data)
+
+    def kneighbors(self, X, n_neighbors=None, return_distance=True):
+        X = np.asarray(X, dtype=self.data_.dtype)
+        k = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+
+        best_d = np.full((len(X), 0), np.inf)
+        best_i = np.empty((len(X), 0), dtype=np.int64)
+
+        for start in range(0, self.n_samples_fit_, BLOCK_ROWS):
+            block = np.asarray(self.data_[start:start + BLOCK_ROWS])
+            d = np.concatenate([best_d, squared_distances(X, block)], axis=1)
+            i = np.concatenate([
+                best_i,
+                np.broadcast_to(np.arange(start, start + len(block)), (len(X), len(block)))
+            ], axis=1)
+
+            top = top_k(d, k)
+            best_d = np.take_along_axis(d, top, axis=1)
+            best_i = np.take_along_axis(i, top, axis=1)
+
+        if return_distance:
+            return np.sqrt(best_d), best_i
+        return best_i
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbours in pure NumPy.
+
+    Rows are bucketed by their closest k-means centroid. A query only
+    scans the n_probe closest buckets, so n_probe is the recall/latency
+    knob: n_probe == n_lists is an exact search.
+
+    The training matrix is referenced, not copied, so an on-disk
+    memmap stays on disk while the index is built.
+    """
+
+    def __init__(self, n_neighbors=5, n_lists=None, n_probe=8,
+                 n_iter=10, sample_size=100_000, random_state=0):
+        self.n_neighbors = n_neighbors
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.sample_size = sample_size
+        self.random_state = random_state
+
+    # ---------------- TRAINING ----------------
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = len(X)
+        if n_rows == 0:
+            raise ValueError("Cannot build an index over zero rows")
+
+        rng = np.random.default_rng(self.random_state)
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(n_rows))), n_rows)
+
+        # k-means on a sample; sorted ids keep memmap reads sequential
+        sample_ids = np.sort(
+            rng.choice(n_rows, min(n_rows, self.sample_size), replace=False)
+        )
+        sample = np.asarray(X[sample_ids])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assign = self._nearest_centroid(sample, centroids)
+            counts = np.bincount(assign, minlength=n_lists)
+            sums = np.stack([
+                np.bincount(assign, weights=sample[:, j], minlength=n_lists)
+                for j in range(sample.shape[1])
+            ], axis=1)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        assign = self._nearest_centroid(X, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=n_lists)
+
+        self.centroids_ = centroids
+        self.offsets_ = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.ids_ = order.astype(np.int64)
+        self.data_ = X
+        self.n_samples_fit_ = n_rows
+        return self
+
+    @classmethod
+    def from_arrays(cls, centroids, offsets, ids, data, n_neighbors, n_probe):
+        """Rebuilds a fitted index around already-loaded (or mmapped) arrays."""
+        index = cls(n_neighbors=n_neighbors, n_lists=len(centroids), n_probe=n_probe)
+        index.centroids_ = centroids
+        index.offsets_ = offsets
+        index.ids_ = ids
+        index.data_ = data
+        index.n_samples_fit_ = len(data)
+        return index
+
+    def _nearest_centroid(self, X, centroids):
+        out = np.empty(len(X), dtype=np.int64)
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = np.asarray(X[start:start + BLOCK_ROWS], dtype=np.float32)
+            out[start:start + len(block)] = squared_distances(
+                block, centroids
+            ).argmin(axis=1)
+        return out
+
+    # ---------------- QUERY ----------------
+
+    def kneighbors(self, X, n_neighbors=None, return_distance=True):
+        X = np.asarray(X, dtype=np.float32)
+        k = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+
+        distances = np.empty((len(X), k), dtype=np.float64)
+        indices = np.empty((len(X), k), dtype=np.int64)
+
+        list_order = np.argsort(squared_distances(X, self.centroids_), axis=1)
+
+        for qi, query in enumerate(X):
+            rows = self._candidates(list_order[qi], k)
+            d = squared_distances(query[None, :], self.data_[rows])[0]
+
+            top = np.argpartition(d, k - 1)[:k] if len(d) > k else np.arange(len(d))
+            top = top[np.argsort(d[top], kind="stable")]
+
+            distances[qi] = np.sqrt(d[top])
+            indices[qi] = rows[top]
+
+        if return_distance:
+            return distances, indices
+        return indices
+
+    def _candidates(self, lists, k):
+        # Probe n_probe buckets, widening only if they hold fewer than k rows
+        buckets = []
+        total = 0
+        for rank, lst in enumerate(lists):
+            start, end = self.offsets_[lst], self.offsets_[lst + 1]
+            if end > start:
+                buckets.append(self.ids_[start:end])
+                total += end - start
+            if rank + 1 >= self.n_probe and total >= k:
+                break
+        # Bucket ids are ascending, so memmap reads stay mostly sequential
+        return np.concatenate(buckets)
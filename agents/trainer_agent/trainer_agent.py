@@ -1,55 +1,208 @@
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
+import os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
 import json
-import joblib
+import time
+import uuid
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import NearestNeighbors
+
+# Imported by package path so pickled indexes load in backend/app.py
+from agents.trainer_agent.neighbor_index import build_index, describe_index, all_neighbors
+from agents.trainer_agent.array_artifacts import ARRAYS_DIR, save_arrays
+from agents.metrics import timer
+from agents.plans import load_plan
+from agents.columnar import columnar_format, empty_frame, read_columns, iter_batches
+
+# Scratch feature matrix of the streaming training mode; deleted once
+# the model's own arrays are saved
+FEATURES_PATH = "train_features.npy"
+DEFAULT_CHUNKSIZE = 100_000
 
 class TrainerAgent:
     def run(self, strategy_path, data_profile_path, dataset_path):
-        strategy = self._load(strategy_path)
-        data = self._load(data_profile_path)
+        strategy = load_plan(strategy_path)
+        data = load_plan(data_profile_path)
 
         if not strategy.get("ai_required"):
             print("⚠️ AI not required")
             return
 
-        df = pd.read_csv(dataset_path)
-        X = df.select_dtypes(include="number")
+        training = strategy.get("training", {})
+        with timer("trainer_step_seconds", step="scale"):
+            if training.get("mode") == "streaming":
+                X_scaled, feature_names, scaler = self._fit_streaming(
+                    dataset_path,
+                    training.get("chunksize", DEFAULT_CHUNKSIZE)
+                )
+            else:
+                X = self._read_features(dataset_path)
 
-# Drop likely index / ID columns automatically
-        X = X.loc[:, ~X.columns.str.contains("unnamed|id", case=False)]
+                scaler = StandardScaler()
+                X_scaled = scaler.fit_transform(X)
+                feature_names = list(X.columns)
 
-        if X.empty:
-            raise ValueError("No numeric columns found in dataset")
+        model_strategy = strategy["model_strategy"]
+        with timer("trainer_step_seconds", step="index"):
+            model = build_index(
+                X_scaled,
+                model_strategy.get("index"),
+                n_neighbors=model_strategy["hyperparameters"]["n_neighbors"]
+            )
 
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+        # Optional item-to-item table served by /similar/{item_id}
+        neighbors = None
+        precompute = model_strategy.get("precompute_neighbors") or {}
+        if precompute.get("enabled"):
+            with timer("trainer_step_seconds", step="precompute") as t:
+                neighbors = all_neighbors(model, X_scaled, precompute.get("k", 10))
+            print(f"ℹ️ Precomputed top-{neighbors[0].shape[1]} neighbors "
+                  f"in {t.elapsed:.1f}s")
 
-        model = NearestNeighbors(
-            n_neighbors=strategy["model_strategy"]["hyperparameters"]["n_neighbors"]
-        )
-        model.fit(X_scaled)
+        version = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
 
-        # Save model artifacts
-        joblib.dump(model, "model.pkl")
-        joblib.dump(scaler, "preprocessor.pkl")
+        # Save model artifacts. The manifest is replaced atomically and
+        # the metadata goes last, so a running backend that hot-reloads
+        # never sees a half-written model.
+        with timer("trainer_step_seconds", step="save"):
+            # Raw arrays, memory-mapped by the backend workers
+            save_arrays(ARRAYS_DIR, model, scaler, version, neighbors=neighbors)
+
+        # model_arrays/ holds its own copy of the rows now; the mapping
+        # still open on the scratch file stays valid until exit
+        if training.get("mode") == "streaming":
+            os.remove(FEATURES_PATH)
 
         # Save metadata (CRITICAL)
         metadata = {
-            "feature_count": X.shape[1],
-            "feature_names": list(X.columns)
+            "model_version": version,
+            "feature_count": len(feature_names),
+            "feature_names": feature_names,
+            "index": describe_index(model),
+            "arrays": ARRAYS_DIR,
+            "neighbors_k": int(neighbors[0].shape[1]) if neighbors is not None else None
         }
 
-        with open("model_metadata.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        self._atomic_write(
+            "model_metadata.json",
+            lambda f: f.write(json.dumps(metadata, indent=2).encode())
+        )
 
         print("✅ Model trained")
-        print("ℹ️ Feature count:", X.shape[1])
+        print("ℹ️ Feature count:", len(feature_names))
+        print("ℹ️ Index:", metadata["index"]["type"])
+
+    # ---------------- STREAMING ----------------
+
+    def _fit_streaming(self, dataset_path, chunksize):
+        """
+        Two chunked passes so peak memory is one chunk, not the dataset:
+        1. partial_fit the scaler
+        2. transform each chunk into an on-disk float32 memmap
+        The index is then built from the memmap.
+        """
+        if columnar_format(dataset_path):
+            columns = self._feature_columns(empty_frame(dataset_path))
+        else:
+            head = pd.read_csv(dataset_path, nrows=chunksize)
+            columns = self._feature_columns(head)
+            del head
+
+        scaler = StandardScaler()
+        n_rows = 0
+        for chunk in self._read_chunks(dataset_path, columns, chunksize):
+            scaler.partial_fit(chunk)
+            n_rows += len(chunk)
+
+        X_scaled = np.lib.format.open_memmap(
+            FEATURES_PATH,
+            mode="w+",
+            dtype=np.float32,
+            shape=(n_rows, len(columns))
+        )
+
+        offset = 0
+        for chunk in self._read_chunks(dataset_path, columns, chunksize):
+            X_scaled[offset:offset + len(chunk)] = scaler.transform(chunk)
+            offset += len(chunk)
+        X_scaled.flush()
+
+        print(f"ℹ️ Streamed {n_rows} rows into {FEATURES_PATH}")
+        return X_scaled, columns, scaler
+
+    def _read_chunks(self, dataset_path, columns, chunksize):
+        """
+        float32 chunks of `columns`. The columns are picked from the
+        first chunk, so a later non-numeric value fails here: the error
+        names the rows of the chunk that could not be read.
+        """
+        chunks = self._float_chunks(dataset_path, columns, chunksize)
+        start = 0
+        while True:
+            try:
+                chunk = next(chunks, None)
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Non-numeric value in feature columns {columns} of "
+                    f"{dataset_path}, rows {start}-{start + chunksize - 1} "
+                    f"(columns are picked from the first {chunksize} rows): {e}"
+                ) from None
+            if chunk is None:
+                return
+            yield chunk
+            start += len(chunk)
+
+    def _float_chunks(self, dataset_path, columns, chunksize):
+        if columnar_format(dataset_path):
+            for chunk in iter_batches(dataset_path, columns, chunksize):
+                yield chunk[columns].astype(np.float32)
+            return
+
+        reader = pd.read_csv(
+            dataset_path,
+            usecols=columns,
+            dtype=np.float32,
+            chunksize=chunksize
+        )
+        for chunk in reader:
+            yield chunk[columns]
+
+    # ---------------- HELPERS ----------------
+
+    def _read_features(self, dataset_path):
+        """
+        Feature columns only. Columnar files pick them from the schema
+        (same rule as for CSV) and read nothing else from disk.
+        """
+        if columnar_format(dataset_path):
+            columns = self._feature_columns(empty_frame(dataset_path))
+            return read_columns(dataset_path, columns)[columns]
+
+        df = pd.read_csv(dataset_path)
+        return df[self._feature_columns(df)]
+
+    def _atomic_write(self, path, write):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def _feature_columns(self, df):
+        X = df.select_dtypes(include="number")
+
+        # Drop likely index / ID columns automatically
+        X = X.loc[:, ~X.columns.str.contains("unnamed|id", case=False)]
+
+        # Columns, not X.empty: schema-only frames have no rows
+        if X.columns.empty:
+            raise ValueError("No numeric columns found in dataset")
 
-    def _load(self, path):
-        with open(path) as f:
-            return json.load(f)
+        return list(X.columns)
 
 if __name__ == "__main__":
-    import sys
     TrainerAgent().run(sys.argv[1], sys.argv[2], sys.argv[3])
@@ -6,17 +6,33 @@ if BASE_DIR not in sys.path:
     sys.path.append(BASE_DIR)
 
 # ---------- STANDARD IMPORTS ----------
-from fastapi import FastAPI, Body, Request
+from fastapi import FastAPI, Body, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
-import joblib
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, Response, PlainTextResponse, StreamingResponse
+)
 import json
+import math
+import time
+import asyncio
+import threading
 import numpy as np
-import subprocess
 import shutil
 
 # ---------- AGENTS ----------
-from agents.chat_spec_agent.chat_spec_agent import ChatSpecAgent
+# ChatSpecAgent (and google.genai behind it) is imported by the warm-up
+from agents.chat_spec_agent.session_store import new_session_id
+from agents.metrics import REGISTRY
+
+# ---------- BACKEND ----------
+from backend import config
+from backend.artifacts import ArtifactStore, timed_kneighbors, observe_query
+from backend.builds import BuildQueue
+from backend.predict_pool import PredictPool, PoolBusy
+from backend.micro_batcher import MicroBatcher
+from backend.predict_cache import PredictCache
+from backend.page_cache import PageCache, pick_encoding, etag_matches
 
 # ---------- APP ----------
 app = FastAPI(title="AutoDev Backend")
@@ -30,21 +46,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------- METRICS ----------
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Requests by route and status", ("method", "route", "status")
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "Request latency by route", ("method", "route")
+)
+BUILD_STAGE_LAST = REGISTRY.gauge(
+    "build_last_stage_seconds", "Stage durations of the latest build", ("stage", "status")
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route templates, not raw paths, keep label cardinality bounded
+        route = request.scope.get("route")
+        path = route.path if route else "unmatched"
+        HTTP_REQUESTS.inc(method=request.method, route=path, status=status)
+        HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method, route=path)
+
 # ---------- PATHS ----------
 FRONTEND_DIR = os.path.join(BASE_DIR, "frontend")
 MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")
 PREPROCESSOR_PATH = os.path.join(BASE_DIR, "preprocessor.pkl")
 METADATA_PATH = os.path.join(BASE_DIR, "model_metadata.json")
 STRATEGY_PATH = os.path.join(BASE_DIR, "training_strategy_v1.json")
+BUILD_STATUS = os.path.join(BASE_DIR, "build_status.json")
 DRAFT_SPEC = os.path.join(BASE_DIR, "application_spec_draft.json")
 FINAL_SPEC = os.path.join(BASE_DIR, "application_spec_v1.json")
 
 # ---------- GLOBAL STATE ----------
-model = None
-scaler = None
-metadata = None
-strategy = None
+ARTIFACT_ARGS = (
+    MODEL_PATH, PREPROCESSOR_PATH, METADATA_PATH, STRATEGY_PATH,
+    config.ARRAYS_PATH, config.ARTIFACT_FORMAT == "mmap"
+)
+artifacts = ArtifactStore(*ARTIFACT_ARGS[:4], arrays_path=ARTIFACT_ARGS[4],
+                          mmap=ARTIFACT_ARGS[5])
+predict_pool = None
+predict_batcher = None
+# LEARNING_PARADIGM = "dl": torch model behind a batching inference thread
+dl_runner = None
+predict_cache = PredictCache(
+    max_entries=config.PREDICT_CACHE_SIZE,
+    ttl_s=config.PREDICT_CACHE_TTL_S,
+    decimals=config.PREDICT_CACHE_DECIMALS
+)
+# Results of the old model are dead weight once a new one is live
+artifacts.listeners.append(predict_cache.clear)
 chat_agent = None
+warmed_up = threading.Event()
+page_cache = PageCache(FRONTEND_DIR)
+builds = BuildQueue(config.BUILD_ROOT, workers=config.BUILD_WORKERS, keep=config.BUILD_KEEP)
 
 # ============================================================
 # ROUTE MANIFEST (SOURCE OF TRUTH)
@@ -65,58 +124,121 @@ def route_manifest():
 # ============================================================
 # WEBSITE PAGE SERVING
 # ============================================================
-def serve_html(file_path: str):
-    full_path = os.path.join(FRONTEND_DIR, file_path)
-    if not os.path.exists(full_path):
+def serve_html(file_path: str, request: Request):
+    page = page_cache.get(file_path)
+    if page is None:
         return HTMLResponse(
             f"<h1>404</h1><p>{file_path} not built yet.</p>",
             status_code=404
         )
-    with open(full_path) as f:
-        return HTMLResponse(f.read())
+
+    encoding = pick_encoding(request.headers.get("accept-encoding", ""), page)
+    headers = {
+        # One tag per encoding: the gzip and identity bodies differ
+        "ETag": page.etag(encoding),
+        "Last-Modified": page.last_modified,
+        # Always revalidate: the orchestrator may rebuild at any time
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), page):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        body = page.encoded[encoding]
+    else:
+        body = page.body
+
+    return Response(body, media_type="text/html; charset=utf-8", headers=headers)
 
 @app.get("/", response_class=HTMLResponse)
-def home():
-    return serve_html("index.html")
+def home(request: Request):
+    return serve_html("index.html", request)
 
 @app.get("/about", response_class=HTMLResponse)
-def about():
-    return serve_html("about.html")
+def about(request: Request):
+    return serve_html("about.html", request)
 
 @app.get("/portfolio", response_class=HTMLResponse)
-def portfolio():
-    return serve_html("portfolio.html")
+def portfolio(request: Request):
+    return serve_html("portfolio.html", request)
 
 @app.get("/blog", response_class=HTMLResponse)
-def blog():
-    return serve_html("blog.html")
+def blog(request: Request):
+    return serve_html("blog.html", request)
 
 @app.get("/contact", response_class=HTMLResponse)
-def contact():
-    return serve_html("contact.html")
+def contact(request: Request):
+    return serve_html("contact.html", request)
 
 @app.get("/admin/login", response_class=HTMLResponse)
-def admin_login():
-    return serve_html("admin/login.html")
+def admin_login(request: Request):
+    return serve_html("admin/login.html", request)
 
 # ============================================================
 # CHAT (CONVERSATION PHASE)
 # ============================================================
-@app.on_event("startup")
 def init_chat_agent():
     global chat_agent
     try:
+        from agents.chat_spec_agent.chat_spec_agent import ChatSpecAgent
+
         chat_agent = ChatSpecAgent()
         print("✅ ChatSpecAgent ready")
     except Exception as e:
         chat_agent = None
         print("⚠️ ChatSpecAgent disabled:", e)
 
+def chat_unavailable():
+    if not warmed_up.is_set():
+        return JSONResponse({"error": "Chat agent warming up, retry shortly"}, status_code=503)
+    return {"error": "Chat agent unavailable"}
+
 @app.post("/chat")
-def chat(data: dict = Body(default={})):
+async def chat(data: dict = Body(default={})):
+    # Async: waiting on the LLM holds no threadpool worker
+    if not chat_agent:
+        return chat_unavailable()
+
+    # No session id: this message starts a new conversation
+    session_id = data.get("session_id") or new_session_id()
+    state = await chat_agent.arun(data.get("message", ""), session_id)
+    return {"session_id": session_id, **state}
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(data: dict = Body(default={})):
+    """
+    /chat over server-sent events: `token` events carry raw model text
+    as it arrives, `field` events each completed top-level field of the
+    JSON update (a `reset` event discards the fields sent so far), and
+    a final `state` event the saved state.
+    A `session` event comes first with the conversation's id.
+    """
     if not chat_agent:
-        return {"error": "Chat agent unavailable"}
-    return chat_agent.run(data.get("message", ""))
+        return chat_unavailable()
+
+    session_id = data.get("session_id") or new_session_id()
+
+    async def events():
+        yield sse("session", {"session_id": session_id})
+        try:
+            async for event, payload in chat_agent.astream(data.get("message", ""), session_id):
+                if event == "token":
+                    payload = {"text": payload}
+                yield sse(event, payload)
+        except Exception as e:
+            yield sse("error", {"error": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # ============================================================
 # BUILD CONTROL (LOCK + ORCHESTRATE)
@@ -127,57 +249,359 @@ def go(_: dict = Body(default={})):
         return {"error": "No draft spec to build"}
 
     shutil.copy(DRAFT_SPEC, FINAL_SPEC)
+    with open(FINAL_SPEC) as f:
+        spec = json.load(f)
 
-    subprocess.Popen(
-        ["python", os.path.join(BASE_DIR, "orchestrator.py")],
-        cwd=BASE_DIR
-    )
+    # Same spec already queued or building: join that job
+    job, coalesced = builds.submit(spec)
 
     return {
-        "status": "BUILD_STARTED",
+        "status": "BUILD_JOINED" if coalesced else "BUILD_QUEUED",
+        "build_id": job.id,
+        "status_url": f"/builds/{job.id}",
+        "logs_url": f"/builds/{job.id}/logs",
         "preview_url": "http://127.0.0.1:8000/"
     }
 
+@app.get("/builds")
+def list_builds():
+    return {"builds": builds.list()}
+
+@app.get("/builds/{build_id}")
+def build_status(build_id: str):
+    job = builds.get(build_id)
+    if not job:
+        return JSONResponse({"error": "Unknown build"}, status_code=404)
+    return job.to_dict()
+
+@app.get("/builds/{build_id}/logs")
+def build_logs(build_id: str, request: Request):
+    """Server-sent events: one `data:` line per log line, then `end`."""
+    job = builds.get(build_id)
+    if not job:
+        return JSONResponse({"error": "Unknown build"}, status_code=404)
+
+    # Reconnecting EventSource clients resume where they left off
+    last_id = request.headers.get("last-event-id", "0")
+    offset = int(last_id) if last_id.isdigit() else 0
+
+    async def events():
+        async for position, line in builds.follow(job, offset):
+            yield f"id: {position}\ndata: {line}\n\n"
+        yield f"event: end\ndata: {job.status}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.on_event("shutdown")
+def stop_builds():
+    builds.shutdown()
+
 # ============================================================
 # ML CONTEXT
 # ============================================================
 @app.on_event("startup")
-def load_artifacts():
-    global model, scaler, metadata, strategy
+def start_serving():
+    global predict_pool, predict_batcher
 
-    if os.path.exists(STRATEGY_PATH):
-        with open(STRATEGY_PATH) as f:
-            strategy = json.load(f)
+    if config.SERVER_WORKERS > 1:
+        print("⚠️ Builds are tracked per worker: /builds/{id} only answers "
+              "on the worker that ran /go. Use AUTODEV_SERVER_WORKERS=1 for builds")
+
+    # Pages and /routes answer at once; the model and the chat agent
+    # (google.genai) load behind them
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+    if config.PREDICT_WORKERS > 0:
+        predict_pool = PredictPool(
+            config.PREDICT_WORKERS, config.PREDICT_MAX_QUEUE, ARTIFACT_ARGS
+        )
+        print(f"✅ Predict pool: {config.PREDICT_WORKERS} worker processes")
+
+    if config.BATCH_MAX_WAIT_MS > 0:
+        predict_batcher = MicroBatcher(
+            run_kneighbors,
+            max_size=config.BATCH_MAX_SIZE,
+            max_wait_s=config.BATCH_MAX_WAIT_MS / 1000
+        )
+
+def warm_up():
+    started = time.perf_counter()
+    try:
+        if config.LEARNING_PARADIGM == "dl":
+            load_dl_runner()
+        else:
+            artifacts.reload(force=True)
+            artifacts.start_watcher(config.ARTIFACT_POLL_S)
+        init_chat_agent()
+    finally:
+        warmed_up.set()
+        print(f"ℹ️ Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+def load_dl_runner():
+    global dl_runner
+    # torch is only imported on this path
+    from backend.inference import TorchRunner, configure_threads, load_dl_model
+
+    try:
+        threads, interop = configure_threads(
+            config.TORCH_THREADS, config.TORCH_INTEROP_THREADS, config.SERVER_WORKERS
+        )
+
+        metadata = {}
+        if os.path.exists(METADATA_PATH):
+            with open(METADATA_PATH) as f:
+                metadata = json.load(f)
+        n_features = metadata.get("feature_count")
+
+        model = load_dl_model(config.DL_MODEL_PATH, n_features, quantize=config.DL_QUANTIZE)
+        dl_runner = TorchRunner(
+            model,
+            n_features=n_features,
+            version=metadata.get("model_version"),
+            max_size=config.BATCH_MAX_SIZE,
+            max_wait_s=config.BATCH_MAX_WAIT_MS / 1000
+        )
+        print(f"✅ DL model ready: {threads} threads, {interop} interop threads")
+    except Exception as e:
+        dl_runner = None
+        print("⚠️ DL model not loaded:", e)
 
-    if not os.path.exists(MODEL_PATH):
-        return
+@app.get("/ready")
+def ready():
+    """Readiness: 200 once the warm-up has run, 503 before."""
+    body = {
+        "ready": warmed_up.is_set(),
+        "model_version": dl_runner.version if dl_runner else artifacts.current.version,
+        "chat": chat_agent is not None
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
 
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(PREPROCESSOR_PATH)
+@app.on_event("shutdown")
+def stop_artifact_watcher():
+    artifacts.stop_watcher()
+    if predict_pool:
+        predict_pool.shutdown()
+    if dl_runner:
+        dl_runner.close()
 
-    if os.path.exists(METADATA_PATH):
-        with open(METADATA_PATH) as f:
-            metadata = json.load(f)
+@app.post("/admin/reload")
+def reload_artifacts(_: dict = Body(default={})):
+    reloaded = artifacts.reload()
+    return {
+        "reloaded": reloaded,
+        "version": artifacts.current.version,
+        "error": artifacts.last_error
+    }
 
 @app.get("/context")
 def context():
-    return {"strategy": strategy, "metadata": metadata}
+    bundle = artifacts.current
+    return {
+        "strategy": bundle.strategy,
+        "metadata": bundle.metadata,
+        "model_version": bundle.version,
+        "loaded_at": bundle.loaded_at,
+        "reload_error": artifacts.last_error,
+        "predict_pool": predict_pool.stats() if predict_pool else None,
+        "micro_batching": predict_batcher.stats() if predict_batcher else None,
+        "predict_cache": predict_cache.stats(),
+        "dl": dl_runner.stats() if dl_runner else None
+    }
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text format."""
+    # Builds run in their own process; surface the last one's timings.
+    # Replaced, not updated: an earlier build's stage/status series go away
+    if os.path.exists(BUILD_STATUS):
+        with open(BUILD_STATUS) as f:
+            build = json.load(f)
+        BUILD_STAGE_LAST.replace(
+            (stage["duration_s"], {"stage": name, "status": stage["status"]})
+            for name, stage in build.get("stages", {}).items()
+            if "duration_s" in stage
+        )
+
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+async def run_kneighbors(bundle, X):
+    """
+    transform + kneighbors on the predict pool when it is enabled,
+    else on the threadpool. Returns (distances, indices, model_version).
+    """
+    if predict_pool is None:
+        distances, indices, timings = await run_in_threadpool(timed_kneighbors, bundle, X)
+        observe_query(timings)
+        return distances, indices, bundle.version
+    return await predict_pool.kneighbors(bundle.version, X)
+
+def queue_full():
+    return JSONResponse({"error": "Predict queue full, retry later"}, status_code=503)
+
+def invalid_input(error):
+    """Every rejected request body: 422 with {"error": ..., details}."""
+    return JSONResponse(error, status_code=422)
+
+async def predict_dl(rows):
+    """Forward pass on the DL model; concurrent calls share one batch."""
+    if dl_runner is None:
+        return {"error": "Model not ready"}
+
+    try:
+        future = dl_runner.submit(rows)
+    except (TypeError, ValueError) as e:
+        return invalid_input({"error": "Invalid features", "detail": str(e)})
+
+    output = await asyncio.wrap_future(future)
+    return {"outputs": output.tolist(), "model_version": dl_runner.version}
 
 @app.post("/predict")
-def predict(data: dict):
-    if not model or not metadata:
+async def predict(data: dict):
+    if config.LEARNING_PARADIGM == "dl":
+        return await predict_dl([data.get("features", [])])
+
+    # One read of the active bundle: a reload mid-request can't mix versions
+    bundle = artifacts.current
+    if not bundle.ready:
         return {"error": "Model not ready"}
 
     features = data.get("features", [])
-    if len(features) != metadata["feature_count"]:
-        return {
-            "error": "Invalid feature length",
-            "expected": metadata["feature_count"],
-            "received": len(features)
-        }
-
-    X = np.array(features).reshape(1, -1)
-    X_scaled = scaler.transform(X)
-    distances, indices = model.kneighbors(X_scaled)
-
-    return {"neighbors": indices.tolist(), "distances": distances.tolist()}
+    if not isinstance(features, list):
+        return invalid_input({"error": "features must be a list"})
+
+    # Checked per request: a NaN/inf row must not reach a shared batch.
+    # Same checks and messages as a /predict/batch row
+    X, _, errors = validate_rows([features], bundle.metadata["feature_count"])
+    if errors:
+        errors[0].pop("row")
+        return invalid_input(errors[0])
+
+    cache_key = predict_cache.key(bundle.version, X)
+    cached = predict_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        # Concurrent single-row calls share one vectorized query
+        if predict_batcher:
+            distances, indices, _ = await predict_batcher.submit(bundle, X)
+        else:
+            distances, indices, _ = await run_kneighbors(bundle, X)
+    except PoolBusy:
+        return queue_full()
+
+    result = {"neighbors": indices.tolist(), "distances": distances.tolist()}
+    predict_cache.put(cache_key, result)
+    return result
+
+@app.get("/similar/{item_id}")
+def similar(item_id: int, k: int = Query(None, ge=1)):
+    """Item-to-item lookup in the trainer's precomputed top-k table."""
+    bundle = artifacts.current
+    if bundle.neighbors is None:
+        return JSONResponse(
+            {"error": "No precomputed neighbors; retrain with precompute_neighbors enabled"},
+            status_code=404
+        )
+
+    ids, distances = bundle.neighbors
+    if not 0 <= item_id < len(ids):
+        return JSONResponse(
+            {"error": "Unknown item", "item_count": len(ids)},
+            status_code=404
+        )
+
+    k = min(k or ids.shape[1], ids.shape[1])
+    return {
+        "item": item_id,
+        "neighbors": ids[item_id, :k].tolist(),
+        "distances": distances[item_id, :k].tolist(),
+        "model_version": bundle.version
+    }
+
+@app.post("/predict/batch")
+async def predict_batch(data: dict):
+    """
+    A malformed request is rejected like /predict (422). Otherwise the
+    valid rows are answered and each invalid row is listed in `errors`
+    with the same message /predict would give it.
+    """
+    if config.LEARNING_PARADIGM == "dl":
+        return await predict_dl(data.get("features", []))
+
+    bundle = artifacts.current
+    if not bundle.ready:
+        return {"error": "Model not ready"}
+
+    rows = data.get("features", [])
+    if not isinstance(rows, list):
+        return invalid_input({"error": "features must be a list of rows"})
+
+    X, row_ids, errors = validate_rows(rows, bundle.metadata["feature_count"])
+
+    results = []
+    version = bundle.version
+    if row_ids:
+        # One transform + one kneighbors call for the whole block
+        try:
+            distances, indices, version = await run_kneighbors(bundle, X)
+        except PoolBusy:
+            return queue_full()
+
+        for row_id, idx, dist in zip(row_ids, indices.tolist(), distances.tolist()):
+            results.append({"row": row_id, "neighbors": idx, "distances": dist})
+
+    return {"results": results, "errors": errors, "model_version": version}
+
+def validate_rows(rows, expected):
+    """
+    Single pass over the request matrix.
+    Returns the valid rows as one float array, their original
+    positions, and a per-row error list for the rest.
+    """
+    valid, row_ids, errors = [], [], []
+
+    for i, row in enumerate(rows):
+        if not isinstance(row, list):
+            errors.append({"row": i, "error": "Row must be a list"})
+            continue
+
+        if len(row) != expected:
+            errors.append({
+                "row": i,
+                "error": "Invalid feature length",
+                "expected": expected,
+                "received": len(row)
+            })
+            continue
+
+        try:
+            values = [float(v) for v in row]
+        except (TypeError, ValueError):
+            errors.append({"row": i, "error": "Non-numeric feature value"})
+            continue
+
+        if not all(math.isfinite(v) for v in values):
+            errors.append({"row": i, "error": "Non-finite feature value"})
+            continue
+
+        valid.append(values)
+
+        row_ids.append(i)
+
+    X = np.array(valid, dtype=float).reshape(len(valid), expected)
+    return X, row_ids, errors
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Each server worker is its own process; with the mmap artifact
+    # format they all share one copy of the model pages
+    uvicorn.run(
+        "backend.app:app", app_dir=BASE_DIR,
+        host="0.0.0.0", port=8000, workers=config.SERVER_WORKERS
+    )
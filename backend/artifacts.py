@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+from agents.trainer_agent.array_artifacts import MANIFEST, load_arrays, load_neighbor_table
+from agents.metrics import REGISTRY, timer
+
+RELOADS = REGISTRY.counter(
+    "artifact_reloads_total", "Model artifact reloads by result", ("result",)
+)
+QUERY_SECONDS = REGISTRY.histogram(
+    "predict_stage_seconds", "Time in scaler.transform vs model.kneighbors", ("stage",)
+)
+
+
+def timed_kneighbors(bundle, X):
+    """transform + kneighbors, returning (distances, indices, timings)."""
+    started = time.perf_counter()
+    X_scaled = bundle.scaler.transform(X)
+    scaled = time.perf_counter()
+    distances, indices = bundle.model.kneighbors(X_scaled)
+    timings = {"transform": scaled - started, "kneighbors": time.perf_counter() - scaled}
+    return distances, indices, timings
+
+
+def observe_query(timings):
+    for stage, seconds in timings.items():
+        QUERY_SECONDS.observe(seconds, stage=stage)
+
+
+class ArtifactBundle:
+    """One consistent model + scaler + metadata (+ strategy) version."""
+
+    def __init__(self, model, scaler, metadata, strategy, version, source=None,
+                 neighbors=None):
+        self.model = model
+        self.scaler = scaler
+        self.metadata = metadata
+        self.strategy = strategy
+        self.version = version
+        # Fingerprint of the files it was loaded from
+        self.source = source
+        # Precomputed (ids, distances) per training row, if trained with it
+        self.neighbors = neighbors
+        self.loaded_at = time.time()
+
+    @property
+    def ready(self):
+        return self.model is not None and self.metadata is not None
+
+
+class ArtifactStore:
+    """
+    Holds the active ArtifactBundle and replaces it without a restart.
+
+    A reload loads and validates a complete new bundle off to the side,
+    then swaps `current` in one assignment. Handlers read `current`
+    once per request, so in-flight requests finish on the version they
+    started with.
+
+    The trainer writes model_metadata.json last, so its mtime (or its
+    model_version field) marks a finished training run.
+
+    With arrays_path set, the model is loaded from the trainer's array
+    artifacts (memory-mapped unless mmap=False); the pickles are the
+    fallback for models trained before that format existed.
+    """
+
+    def __init__(self, model_path, preprocessor_path, metadata_path, strategy_path,
+                 arrays_path=None, mmap=True):
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.metadata_path = metadata_path
+        self.strategy_path = strategy_path
+        self.arrays_path = arrays_path
+        self.mmap = mmap
+
+        self.current = ArtifactBundle(None, None, None, None, None)
+        self.last_error = None
+        self.reload_lock = threading.Lock()
+        self.listeners = []
+
+        self._stop = threading.Event()
+        self._watcher = None
+
+    # ---------------- LOADING ----------------
+
+    def version_on_disk(self):
+        h = hashlib.sha256()
+        for path in self._artifact_files():
+            if not os.path.exists(path):
+                return None
+            stat = os.stat(path)
+            h.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        return h.hexdigest()[:16]
+
+    def _artifact_files(self):
+        if self.arrays_path and os.path.exists(os.path.join(self.arrays_path, MANIFEST)):
+            return (os.path.join(self.arrays_path, MANIFEST), self.metadata_path)
+        return (self.model_path, self.preprocessor_path, self.metadata_path)
+
+    def reload(self, force=False):
+        """
+        Load + validate + swap. Returns True if a new bundle went live.
+        On failure the old bundle keeps serving and last_error is set.
+        """
+        with self.reload_lock:
+            source = self.version_on_disk()
+            if not force and source == self.current.source:
+                return False
+
+            try:
+                with timer("artifact_load_seconds", "Load + validate time of a model bundle"):
+                    bundle = self._load(source)
+                    self._validate(bundle)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                RELOADS.inc(result="failed")
+                print("⚠️ Artifact reload failed:", self.last_error)
+                return False
+            RELOADS.inc(result="ok")
+
+            self.current = bundle
+            self.last_error = None
+
+        for listener in self.listeners:
+            listener(bundle)
+
+        if bundle.ready:
+            print("✅ Model artifacts loaded, version", bundle.version)
+        return True
+
+    def _load(self, source):
+        strategy = None
+        if os.path.exists(self.strategy_path):
+            with open(self.strategy_path) as f:
+                strategy = json.load(f)
+
+        if source is None:
+            return ArtifactBundle(None, None, None, strategy, None)
+
+        with open(self.metadata_path) as f:
+            metadata = json.load(f)
+
+        # Any index from agents/trainer_agent/neighbor_index.py;
+        # all of them expose the sklearn kneighbors() contract
+        neighbors = None
+        if len(self._artifact_files()) == 2:
+            model, scaler, manifest = load_arrays(self.arrays_path, mmap=self.mmap)
+            if manifest["model_version"] != metadata.get("model_version"):
+                raise ValueError("array artifacts and metadata are from different training runs")
+            neighbors = load_neighbor_table(self.arrays_path, manifest)
+        else:
+            import joblib  # pickle format only; unpickling pulls in sklearn
+
+            model = joblib.load(self.model_path)
+            scaler = joblib.load(self.preprocessor_path)
+
+        version = metadata.get("model_version", source)
+        return ArtifactBundle(model, scaler, metadata, strategy, version, source, neighbors)
+
+    def _validate(self, bundle):
+        if not bundle.ready:
+            return
+
+        n_features = bundle.metadata["feature_count"]
+        expected = getattr(bundle.scaler, "n_features_in_", n_features)
+        if expected != n_features:
+            raise ValueError(
+                f"scaler expects {expected} features, metadata says {n_features}"
+            )
+
+        # Probe query: the bundle must answer before it serves traffic
+        probe = bundle.scaler.transform(np.zeros((1, n_features)))
+        bundle.model.kneighbors(probe)
+
+    # ---------------- WATCHER ----------------
+
+    def start_watcher(self, poll_s):
+        if poll_s <= 0 or self._watcher:
+            return
+
+        def watch():
+            seen = self.version_on_disk()
+            failed = None
+            while not self._stop.wait(poll_s):
+                source = self.version_on_disk()
+                # Act once the files have stopped changing for one poll
+                if source != seen:
+                    seen = source
+                    continue
+                if source not in (self.current.source, failed):
+                    failed = None if self.reload() else source
+
+        self._watcher = threading.Thread(target=watch, name="artifact-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORCHESTRATOR = os.path.join(BASE_DIR, "orchestrator.py")
+
+# Copied from the shared tree into every job's work directory
+BUILD_INPUTS = ["project_spec_v1.json", "data_profile_v1.json"]
+DATA_DIR = "data"
+
+ACTIVE = ("QUEUED", "RUNNING")
+
+
+class BuildJob:
+    def __init__(self, job_id, spec_hash, workdir):
+        self.id = job_id
+        self.spec_hash = spec_hash
+        self.workdir = workdir
+        self.log_path = os.path.join(workdir, "build.log")
+        self.status = "QUEUED"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.returncode = None
+        self.published = False
+        # Log streams open on this job; _prune keeps its directory
+        self.followers = 0
+
+    @property
+    def done(self):
+        return self.status not in ACTIVE
+
+    def to_dict(self):
+        info = {
+            "id": self.id,
+            "status": self.status,
+            "spec_hash": self.spec_hash,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "returncode": self.returncode,
+            "published": self.published,
+        }
+
+        # Per-stage progress written by the job's orchestrator
+        status_path = os.path.join(self.workdir, "build_status.json")
+        if os.path.exists(status_path):
+            with open(status_path) as f:
+                info["stages"] = json.load(f).get("stages", {})
+        return info
+
+
+class BuildQueue:
+    """
+    Runs orchestrator builds for /go.
+
+    - every job gets an id and its own work directory, so concurrent
+      builds never share build_status.json or artifacts
+    - a request for a spec already queued or running joins that job
+    - at most `workers` orchestrators run at once; the rest queue
+    - a finished build is published into the shared tree (the site and
+      model the backend serves) under a lock, one build at a time
+
+    Stage outputs are still shared across jobs through the build cache.
+
+    Job state lives in this process: serve builds with one server worker
+    (AUTODEV_SERVER_WORKERS=1). Each worker would run its own queue, so
+    /builds/{id} would 404 on the others, and coalescing and `workers`
+    would only hold per process.
+    """
+
+    def __init__(self, root, workers=2, keep=20, data_path="data/sample.csv"):
+        self.root = root
+        self.keep = keep
+        self.data_path = data_path
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.publish_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="build")
+
+        os.makedirs(root, exist_ok=True)
+
+    # ---------------- SUBMIT ----------------
+
+    def submit(self, spec):
+        """Returns (job, coalesced)."""
+        spec_hash = hashlib.sha256(
+            json.dumps(spec, sort_keys=True).encode()
+        ).hexdigest()[:16]
+
+        with self.lock:
+            for job in self.jobs.values():
+                if job.spec_hash == spec_hash and not job.done:
+                    return job, True
+
+            job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+            job = BuildJob(job_id, spec_hash, os.path.join(self.root, job_id))
+            self._prepare(job, spec)
+            self.jobs[job_id] = job
+            self._prune()
+
+        self.executor.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------- RUN ----------------
+
+    def _prepare(self, job, spec):
+        os.makedirs(job.workdir, exist_ok=True)
+
+        with open(os.path.join(job.workdir, "application_spec_v1.json"), "w") as f:
+            json.dump(spec, f, indent=2)
+
+        for name in BUILD_INPUTS:
+            src = os.path.join(BASE_DIR, name)
+            if os.path.exists(src):
+                shutil.copy(src, os.path.join(job.workdir, name))
+
+        # Datasets can be large: link, don't copy
+        data_dir = os.path.join(BASE_DIR, DATA_DIR)
+        if os.path.isdir(data_dir):
+            os.symlink(data_dir, os.path.join(job.workdir, DATA_DIR))
+
+        open(job.log_path, "w").close()
+
+    def _run(self, job):
+        job.status = "RUNNING"
+        job.started_at = time.time()
+
+        # Always end the job: a job left RUNNING would take every later
+        # submit of its spec and never finish
+        try:
+            with open(job.log_path, "ab") as log:
+                proc = subprocess.Popen(
+                    [sys.executable, ORCHESTRATOR, "--data", self.data_path],
+                    cwd=job.workdir,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    env={**os.environ, "PYTHONUNBUFFERED": "1"}
+                )
+                job.returncode = proc.wait()
+
+            if job.returncode == 0:
+                self._publish(job)
+        except Exception as e:
+            try:
+                with open(job.log_path, "a") as log:
+                    log.write(f"❌ Build failed: {e}\n")
+            except OSError:
+                pass
+            job.returncode = -1
+        finally:
+            if job.returncode is None:
+                job.returncode = -1
+            job.status = "DONE" if job.returncode == 0 else "FAILED"
+            job.finished_at = time.time()
+
+    def _publish(self, job):
+        """Copy the job's outputs over the shared tree, one build at a time."""
+        from orchestrator import build_stages
+
+        outputs = ["application_spec_v1.json", "build_status.json"]
+        spec_path = os.path.join(job.workdir, "application_spec_v1.json")
+        for stage in build_stages(self.data_path, spec_path):
+            outputs.extend(stage.outputs)
+
+        with self.publish_lock:
+            # In stage order: model_metadata.json after the model files,
+            # so the artifact watcher reloads one complete version
+            for path in outputs:
+                src = os.path.join(job.workdir, path)
+                if os.path.exists(src):
+                    _replace(src, os.path.join(BASE_DIR, path))
+            job.published = True
+
+    def _prune(self):
+        finished = sorted(
+            (j for j in self.jobs.values() if j.done and not j.followers),
+            key=lambda j: j.created_at
+        )
+        for job in finished[:max(0, len(finished) - self.keep)]:
+            del self.jobs[job.id]
+            shutil.rmtree(job.workdir, ignore_errors=True)
+
+    # ---------------- LOGS ----------------
+
+    async def follow(self, job, offset=0, poll_s=0.25):
+        """
+        Yields (offset, line) from the job's log until the build ends.
+        offset is the byte position after the line, so a client can
+        resume from it (SSE Last-Event-ID).
+
+        A log that no longer exists (the job was pruned) ends the stream.
+        """
+        pending = b""
+        job.followers += 1
+        try:
+            while True:
+                finished = job.done
+                try:
+                    with open(job.log_path, "rb") as f:
+                        f.seek(offset + len(pending))
+                        chunk = f.read()
+                except FileNotFoundError:
+                    chunk, finished = b"", True
+
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    offset += len(line) + 1
+                    yield offset, line.decode(errors="replace")
+
+                if finished:
+                    if pending:
+                        yield offset + len(pending), pending.decode(errors="replace")
+                    return
+                await asyncio.sleep(poll_s)
+        finally:
+            job.followers -= 1
+
+
+def _replace(src, dst):
+    """Atomic per path: readers see the old or the new output, never half."""
+    parent = os.path.dirname(dst)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    tmp = f"{dst}.publish.tmp"
+    if os.path.isdir(src):
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.copytree(src, tmp, copy_function=shutil.copy)
+        old = f"{dst}.publish.old"
+        if os.path.exists(dst):
+            os.replace(dst, old)
+        os.replace(tmp, dst)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        shutil.copy(src, tmp)
+        os.replace(tmp, dst)
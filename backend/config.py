@@ -7,5 +7,53 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")
 PREPROCESSOR_PATH = os.path.join(BASE_DIR, "preprocessor.pkl")
+# Memory-mapped .npy artifacts + manifest, shared by all workers
+ARRAYS_PATH = os.path.join(BASE_DIR, "model_arrays")
+
+# "mmap" maps model_arrays/ read-only (pages shared by all workers),
+# "memory" reads a private copy into each process
+ARTIFACT_FORMAT = "mmap"
 
 MODALITY = "tabular"
+
+# Seconds between checks for retrained artifacts (0 disables the watcher)
+ARTIFACT_POLL_S = 2.0
+
+# ---------------- SERVING ----------------
+# uvicorn worker processes when run as `python backend/app.py`.
+# /go builds are tracked in-process: keep 1 when using them
+SERVER_WORKERS = int(os.getenv("AUTODEV_SERVER_WORKERS", 1))
+
+# Processes running transform + kneighbors for /predict (0 = in-process)
+PREDICT_WORKERS = int(os.getenv("AUTODEV_PREDICT_WORKERS", 0))
+
+# Predict calls allowed to wait for a worker before answering 503
+PREDICT_MAX_QUEUE = int(os.getenv("AUTODEV_PREDICT_MAX_QUEUE", 256))
+
+# Micro-batching of concurrent /predict calls (wait 0 disables)
+BATCH_MAX_SIZE = int(os.getenv("AUTODEV_BATCH_MAX_SIZE", 64))
+BATCH_MAX_WAIT_MS = float(os.getenv("AUTODEV_BATCH_MAX_WAIT_MS", 2))
+
+# /predict result cache: entries, seconds, rounding of the key vector
+PREDICT_CACHE_SIZE = int(os.getenv("AUTODEV_PREDICT_CACHE_SIZE", 10_000))
+PREDICT_CACHE_TTL_S = float(os.getenv("AUTODEV_PREDICT_CACHE_TTL_S", 300))
+PREDICT_CACHE_DECIMALS = 6
+
+# ---------------- DL SERVING ----------------
+# Used when LEARNING_PARADIGM = "dl": TorchScript archive or pickled nn.Module
+DL_MODEL_PATH = os.getenv("AUTODEV_DL_MODEL_PATH", os.path.join(BASE_DIR, "model.pt"))
+
+# Intra-op threads per server worker (0 = cores / SERVER_WORKERS), inter-op threads
+TORCH_THREADS = int(os.getenv("AUTODEV_TORCH_THREADS", 0))
+TORCH_INTEROP_THREADS = int(os.getenv("AUTODEV_TORCH_INTEROP_THREADS", 1))
+
+# Dynamic int8 quantization of Linear/LSTM/GRU layers on load
+DL_QUANTIZE = os.getenv("AUTODEV_DL_QUANTIZE", "0") == "1"
+
+# ---------------- BUILDS ----------------
+# Orchestrator runs allowed at once for /go; the rest queue
+BUILD_WORKERS = int(os.getenv("AUTODEV_BUILD_WORKERS", 2))
+
+# Per-job work directories, and how many finished ones to keep
+BUILD_ROOT = os.getenv("AUTODEV_BUILD_ROOT", os.path.join(BASE_DIR, ".autodev_builds"))
+BUILD_KEEP = 20
@@ -1,8 +1,220 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from agents.metrics import REGISTRY
+
+DL_BATCH_ROWS = REGISTRY.histogram(
+    "dl_batch_rows", "Rows per torch forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+DL_FORWARD_SECONDS = REGISTRY.histogram(
+    "dl_forward_seconds", "Time in one torch forward pass"
+)
+
+# Layer types quantize_dynamic converts to int8
+QUANTIZABLE = ("Linear", "LSTM", "GRU")
+
+_threads_configured = False
+
+
 def run_inference(model, data, paradigm):
     if paradigm == "ml":
         return model.predict(data).tolist()
     elif paradigm == "dl":
-        model.eval()
-        with torch.no_grad():
-            return model(data).tolist()
+        import torch
+
+        with torch.inference_mode():
+            return model(torch.as_tensor(data, dtype=torch.float32)).tolist()
     return None
+
+
+# ---------------- TORCH SETUP ----------------
+
+def configure_threads(threads=0, interop_threads=1, server_workers=1):
+    """
+    Size torch's thread pools once per process.
+
+    threads=0 splits the cores evenly across server worker processes, so
+    N uvicorn workers don't each start a pool as wide as the machine.
+    Requests are already batched onto one inference thread, so the
+    inter-op pool stays small.
+    """
+    global _threads_configured
+    import torch
+
+    if threads <= 0:
+        threads = max(1, (os.cpu_count() or 1) // max(1, server_workers))
+    torch.set_num_threads(threads)
+
+    if not _threads_configured:
+        try:
+            # Only allowed once, before torch runs any parallel work
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            print("⚠️ Interop threads already set:", e)
+        _threads_configured = True
+
+    return threads, torch.get_num_interop_threads()
+
+
+def load_dl_model(path, n_features=None, quantize=False):
+    """
+    Load a model for CPU serving.
+
+    - a TorchScript archive (torch.jit.save) loads as-is
+    - a pickled nn.Module is optionally int8-quantized with
+      quantize_dynamic, then traced on an (1, n_features) input and
+      frozen, so serving never runs Python-level module code
+    """
+    import torch
+
+    try:
+        model = torch.jit.load(path, map_location="cpu")
+        scripted = True
+    except RuntimeError:
+        model = torch.load(path, map_location="cpu", weights_only=False)
+        scripted = False
+    model.eval()
+
+    if quantize:
+        if scripted:
+            # quantize_dynamic rewrites nn.Module children, not TorchScript
+            print("⚠️ Skipping int8 quantization: model is already TorchScript")
+        else:
+            layers = {getattr(torch.nn, name) for name in QUANTIZABLE}
+            model = torch.ao.quantization.quantize_dynamic(model, layers, dtype=torch.qint8)
+            print("✅ Dynamic int8 quantization applied")
+
+    if not scripted and n_features:
+        with torch.no_grad():
+            model = torch.jit.trace(model, torch.zeros(1, n_features))
+        model = torch.jit.freeze(model)
+        print("✅ Model traced to TorchScript")
+
+    return model
+
+
+# ---------------- BATCHED SERVING ----------------
+
+class TorchRunner:
+    """
+    Serves one torch model from a single inference thread.
+
+    Callers put rows on a queue and get a Future. The thread takes the
+    first waiting request, keeps collecting until max_size rows are
+    queued or max_wait_s has passed, runs one forward pass under
+    inference_mode, and hands each caller its slice of the output.
+    One thread owning the model leaves torch's intra-op pool as the
+    only parallelism, instead of request threads contending for it.
+
+    Without n_features, requests of different widths can be queued
+    together; each width then gets its own forward pass. A failure
+    fails only the futures of the pass it happened in, never the thread.
+    """
+
+    def __init__(self, model, n_features=None, version=None, max_size=64, max_wait_s=0.002):
+        self.model = model
+        self.n_features = n_features
+        self.version = version
+        self.max_size = max_size
+        self.max_wait_s = max_wait_s
+
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.rows = 0
+
+        self.thread = threading.Thread(target=self._loop, name="torch-inference", daemon=True)
+        self.thread.start()
+
+    def submit(self, X):
+        """X: (rows, n_features). Returns a Future of the output rows."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or (self.n_features and X.shape[1] != self.n_features):
+            raise ValueError(f"Expected rows of {self.n_features} features, got shape {X.shape}")
+
+        future = Future()
+        self.queue.put((X, future))
+        return future
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait_s * 1000,
+            "queued": self.queue.qsize()
+        }
+
+    def close(self):
+        self.queue.put(None)
+
+    # ---------------- INFERENCE THREAD ----------------
+
+    def _loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+
+            items = [item]
+            rows = len(item[0])
+            deadline = time.monotonic() + self.max_wait_s
+            while rows < self.max_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Finish this batch, then stop
+                    self.queue.put(None)
+                    break
+                items.append(item)
+                rows += len(item[0])
+
+            try:
+                self._run(items)
+            except Exception as e:
+                # Never let one batch kill the thread: later futures would hang
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run(self, items):
+        # A caller may have given up while queued
+        items = [(X, f) for X, f in items if f.set_running_or_notify_cancel()]
+
+        by_width = {}
+        for X, future in items:
+            by_width.setdefault(X.shape[1], []).append((X, future))
+        for group in by_width.values():
+            self._forward(group)
+
+    def _forward(self, items):
+        import torch
+
+        started = time.perf_counter()
+        try:
+            X = np.concatenate([X for X, _ in items])
+            with torch.inference_mode():
+                output = self.model(torch.from_numpy(X)).numpy()
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        DL_FORWARD_SECONDS.observe(time.perf_counter() - started)
+        DL_BATCH_ROWS.observe(len(X))
+        self.batches += 1
+        self.rows += len(X)
+
+        start = 0
+        for rows, future in items:
+            future.set_result(output[start:start + len(rows)])
+            start += len(rows)
@@ -0,0 +1,110 @@
+import asyncio
+
+import numpy as np
+
+
+class _Batch:
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.rows = []
+        self.futures = []
+        self.timer = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predict calls.
+
+    Rows wait up to max_wait_s (or until max_size rows are queued) and
+    then go through one vectorized run_batch(bundle, X) call; each caller
+    gets its own row of the result. Rows are grouped per model version,
+    so a batch never mixes bundles across a hot reload. If the batch
+    call fails, its rows are retried one by one so a single bad row only
+    fails its own caller.
+    """
+
+    def __init__(self, run_batch, max_size=64, max_wait_s=0.002):
+        self.run_batch = run_batch
+        self.max_size = max_size
+        self.max_wait_s = max_wait_s
+
+        self.pending = {}
+        self.running = set()
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, bundle, row):
+        """row: (1, n_features) array. Returns (distances, indices, version)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self.pending.get(bundle.version)
+        if batch is None:
+            batch = self.pending[bundle.version] = _Batch(bundle)
+            batch.timer = loop.call_later(self.max_wait_s, self._flush, bundle.version)
+
+        batch.rows.append(row)
+        batch.futures.append(future)
+        if len(batch.rows) >= self.max_size:
+            self._flush(bundle.version)
+
+        return await future
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait_s * 1000
+        }
+
+    def _flush(self, version):
+        batch = self.pending.pop(version, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+
+        # Keep a reference so the task is not garbage collected mid-run
+        task = asyncio.ensure_future(self._run(batch))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.rows += len(batch.rows)
+
+        try:
+            distances, indices, version = await self.run_batch(
+                batch.bundle, np.vstack(batch.rows)
+            )
+        except Exception as e:
+            if len(batch.rows) == 1:
+                _resolve(batch.futures[0], exception=e)
+            else:
+                await asyncio.gather(*(
+                    self._run_one(batch.bundle, row, future)
+                    for row, future in zip(batch.rows, batch.futures)
+                ))
+            return
+
+        for n, future in enumerate(batch.futures):
+            _resolve(future, (distances[n:n + 1], indices[n:n + 1], version))
+
+    async def _run_one(self, bundle, row, future):
+        try:
+            result = await self.run_batch(bundle, row)
+        except Exception as e:
+            _resolve(future, exception=e)
+        else:
+            _resolve(future, result)
+
+
+def _resolve(future, result=None, exception=None):
+    # A caller may have gone away (client disconnect, cancel)
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
@@ -1,10 +1,18 @@
-import joblib
-import torch
+import os
+
+from agents.trainer_agent.array_artifacts import load_arrays
 
 def load_model(model_path, paradigm):
+    # joblib/torch are imported per branch: each is slow to import and
+    # only one paradigm is ever served
     if paradigm == "ml":
+        if os.path.isdir(model_path):
+            # model_arrays/ directory: memory-mapped, nothing unpickled
+            model, _, _ = load_arrays(model_path)
+            return model
+        import joblib
         return joblib.load(model_path)
     elif paradigm == "dl":
-        model = torch.load(model_path, map_location="cpu")
-        return model
+        from backend.inference import load_dl_model
+        return load_dl_model(model_path)
     return None
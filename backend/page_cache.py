@@ -0,0 +1,102 @@
+import os
+import gzip
+import hashlib
+import threading
+from email.utils import formatdate
+
+from agents.metrics import REGISTRY
+
+PAGE_CACHE = REGISTRY.counter(
+    "page_cache_requests_total", "Page cache lookups by result", ("result",)
+)
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+class Page:
+    def __init__(self, body, mtime_ns, size):
+        self.body = body
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = hashlib.sha1(body).hexdigest()
+        self.last_modified = formatdate(mtime_ns / 1e9, usegmt=True)
+
+        # Pre-compressed once per file version
+        self.encoded = {"gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(body)
+
+    def etag(self, encoding=None):
+        """Strong ETag per representation: "<sha1>", "<sha1>-gzip", "<sha1>-br"."""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+
+class PageCache:
+    """
+    In-memory cache of the built HTML pages.
+
+    Each request costs one stat(); an entry is reused while the file's
+    mtime and size are unchanged, so when the orchestrator rewrites the
+    frontend the next request reloads it.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.pages = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, rel_path):
+        full_path = os.path.join(self.root, rel_path)
+        try:
+            stat = os.stat(full_path)
+        except FileNotFoundError:
+            self.pages.pop(rel_path, None)
+            return None
+
+        page = self.pages.get(rel_path)
+        if page and page.mtime_ns == stat.st_mtime_ns and page.size == stat.st_size:
+            self.hits += 1
+            PAGE_CACHE.inc(result="hit")
+            return page
+
+        with open(full_path, "rb") as f:
+            page = Page(f.read(), stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            self.pages[rel_path] = page
+            self.misses += 1
+        PAGE_CACHE.inc(result="miss")
+        return page
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "pages": len(self.pages)}
+
+
+def pick_encoding(accept_encoding, page):
+    """Best encoding the client accepts (q > 0), preferring br."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip())
+
+    for encoding in ("br", "gzip"):
+        if encoding in page.encoded and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match, page):
+    """True if If-None-Match names any encoding of this page version."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return any(page.etag(e) in tags for e in (None, *page.encoded))
@@ -0,0 +1,80 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from agents.metrics import REGISTRY
+
+PREDICT_CACHE = REGISTRY.counter(
+    "predict_cache_requests_total", "/predict result cache lookups by result", ("result",)
+)
+
+
+class PredictCache:
+    """
+    Bounded LRU + TTL cache of /predict results.
+
+    Keys hash the model version and the feature vector rounded to
+    `decimals`, so repeat lookups of the same item skip scaling and
+    the neighbour search. Cleared whenever new artifacts go live.
+    """
+
+    def __init__(self, max_entries=10_000, ttl_s=300.0, decimals=6):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.decimals = decimals
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, version, features):
+        # + 0.0 folds -0.0 into 0.0 so both hash the same
+        row = np.round(np.asarray(features, dtype=np.float64), self.decimals) + 0.0
+        h = hashlib.sha1(str(version).encode())
+        h.update(row.tobytes())
+        return h.hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and now - entry[0] <= self.ttl_s:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                PREDICT_CACHE.inc(result="hit")
+                return entry[1]
+
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            PREDICT_CACHE.inc(result="miss")
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, *_):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s
+        }
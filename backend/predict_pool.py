@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.artifacts import ArtifactStore, timed_kneighbors, observe_query
+
+
+class PoolBusy(Exception):
+    """Raised when max_queue predict calls are already waiting."""
+
+
+class PredictPool:
+    """
+    Runs scaler.transform + kneighbors in worker processes, so CPU-bound
+    queries use every core instead of sharing one GIL.
+
+    Each worker opens its own ArtifactStore over the same files. With the
+    mmap artifact format the training matrix is mapped, not copied, so
+    N workers share one copy through the OS page cache. Calls carry the
+    front's model version and a worker reloads when it is behind.
+    """
+
+    def __init__(self, workers, max_queue, store_args):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.lock = threading.Lock()
+
+        # spawn: forking a threaded server process is not safe
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(store_args,)
+        )
+
+    async def kneighbors(self, version, X):
+        with self.lock:
+            if self.pending >= self.max_queue:
+                raise PoolBusy(f"{self.pending} predict calls queued")
+            self.pending += 1
+
+        try:
+            future = self.executor.submit(_kneighbors, version, X)
+            distances, indices, version, timings = await asyncio.wrap_future(future)
+            # Workers have their own registries; record timings here
+            observe_query(timings)
+            return distances, indices, version
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def stats(self):
+        return {"workers": self.workers, "max_queue": self.max_queue, "pending": self.pending}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------- WORKER PROCESS ----------------
+
+_store = None
+
+
+def _init_worker(store_args):
+    global _store
+    _store = ArtifactStore(*store_args[:4], arrays_path=store_args[4], mmap=store_args[5])
+    _store.reload(force=True)
+
+
+def _kneighbors(version, X):
+    if _store.current.version != version:
+        _store.reload()
+
+    bundle = _store.current
+    if not bundle.ready:
+        raise RuntimeError("Model not ready in worker")
+
+    distances, indices, timings = timed_kneighbors(bundle, X)
+    return distances, indices, bundle.version, timings
@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files.
+
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.2]
+
+Exits 1 when a benchmark in both files got slower than the threshold
+(relative) and the min delta (absolute, to ignore noise on tiny timings),
+or when a load test started returning errors.
+"""
+import sys
+import json
+import argparse
+
+# (metric, higher is better, unit scale to ms)
+METRICS = [
+    ("median_s", False, 1000),
+    ("p50_ms", False, 1),
+    ("p90_ms", False, 1),
+    # p99 / max vary too much between runs on shared hosts to gate on
+    ("throughput_rps", True, None),
+]
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    rows, regressions = [], []
+
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+
+        for metric, higher_better, to_ms in METRICS:
+            if metric not in base or metric not in cur:
+                continue
+            old, new = base[metric], cur[metric]
+            change = (new - old) / old if old else 0.0
+
+            worse = -change if higher_better else change
+            regressed = worse > threshold
+            if regressed and to_ms is not None:
+                regressed = (new - old) * to_ms > min_delta_ms
+
+            rows.append((name, metric, old, new, change, regressed))
+            if regressed:
+                regressions.append(f"{name}.{metric}")
+
+        if cur.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{name}.errors")
+            rows.append((name, "errors", base.get("errors", 0), cur["errors"], 0.0, True))
+
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"ℹ️ {baseline['meta']['commit']} -> {current['meta']['commit']} "
+          f"(threshold {args.threshold:.0%})")
+
+    rows, regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+    for name, metric, old, new, change, regressed in rows:
+        mark = "❌" if regressed else "  "
+        print(f"{mark} {name:<22} {metric:<15} {old:12.4f} -> {new:12.4f}  {change:+7.1%}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Synthetic tabular datasets for the benchmarks.
+
+    python benchmarks/datagen.py out.csv --rows 100000 [--features 8] [--seed 0]
+
+Columns: item_id, f0..f{n-1} (normal floats), name. Same shape as the
+real datasets: an id column the trainer drops, numeric features, and a
+text column. Written in chunks, so row counts are not memory-bound.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+
+
+def make_csv(path, rows, features=8, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = [f"f{i}" for i in range(features)]
+
+    with open(path, "w", newline="") as f:
+        for start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - start)
+            df = pd.DataFrame(rng.normal(size=(n, features)), columns=columns)
+            df.insert(0, "item_id", np.arange(start, start + n))
+            df["name"] = "item_" + df["item_id"].astype(str)
+            df.to_csv(f, header=start == 0, index=False, float_format="%.6f")
+
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic benchmark CSV")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    make_csv(args.path, args.rows, args.features, args.seed)
+    print(f"✅ {args.rows} rows x {args.features} features -> {args.path}")
@@ -0,0 +1,80 @@
+"""
+Import-time guard for the backend.
+
+Imports backend.app in fresh interpreters and fails (exit 1) when the
+best-of-N time goes over budget, or when a heavy module that serving
+loads lazily got imported eagerly again.
+
+    python benchmarks/import_time.py [--budget-ms 800] [--runs 5]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE = "backend.app"
+DEFAULT_BUDGET_MS = 800
+
+# Loaded on first use (training, pickle artifacts, warm-up), never at import
+LAZY_MODULES = ["sklearn", "joblib", "google.genai", "torch", "pandas"]
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "loaded": [m for m in {lazy!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(runs):
+    code = PROBE.format(module=MODULE, lazy=LAZY_MODULES)
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": BASE_DIR}
+        ).stdout
+        # The probe's JSON is the last line; the app may print before it
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    best = min(r["ms"] for r in results)
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    print(f"ℹ️ import {MODULE}: best {best:.0f}ms of {args.runs} "
+          f"(budget {args.budget_ms:.0f}ms)")
+
+    failed = False
+    if loaded:
+        print(f"❌ Imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if best > args.budget_ms:
+        print(f"❌ Import time over budget by {best - args.budget_ms:.0f}ms")
+        failed = True
+
+    if not failed:
+        print("✅ Import time within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Pipeline stage benchmarks: inspection, training, full orchestrator build.
+
+Every run works inside `workdir`, never the repo tree: the trainer and
+the orchestrator write their outputs to the current directory.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import statistics
+import subprocess
+import contextlib
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inputs an orchestrator build expects next to it (see backend/builds.py)
+BUILD_INPUTS = ["project_spec_v1.json", "data_profile_v1.json", "application_spec_v1.json"]
+
+
+def measure(fn, repeat):
+    """Run fn() `repeat` times; wall-clock seconds per run."""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+
+    return {
+        "median_s": statistics.median(runs),
+        "min_s": min(runs),
+        "max_s": max(runs),
+        "runs_s": runs
+    }
+
+
+@contextlib.contextmanager
+def quiet_in(workdir):
+    """cwd = workdir, agent prints swallowed."""
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.chdir(cwd)
+
+
+# ---------------- STAGES ----------------
+
+def bench_inspect(csv_path, repeat):
+    from agents.data_inspector.data_inspector import DataInspectorAgent
+
+    agent = DataInspectorAgent()
+    return {
+        "inspect_csv": measure(lambda: agent.inspect_csv(csv_path), repeat),
+        "inspect_csv_fast": measure(lambda: agent.inspect_csv_fast(csv_path), repeat)
+    }
+
+
+def bench_train(workdir, csv_path, repeat):
+    """Leaves the trained artifacts in workdir for the serving benchmarks."""
+    from agents.data_inspector.data_inspector import DataInspectorAgent
+    from agents.trainer_agent.trainer_agent import TrainerAgent
+
+    shutil.copy(os.path.join(BASE_DIR, "training_strategy_v1.json"), workdir)
+    profile = DataInspectorAgent().inspect_csv(csv_path)
+    with open(os.path.join(workdir, "data_profile_v1.json"), "w") as f:
+        json.dump(profile, f, indent=2)
+
+    def train():
+        with quiet_in(workdir):
+            TrainerAgent().run("training_strategy_v1.json", "data_profile_v1.json", csv_path)
+
+    return {"train": measure(train, repeat)}
+
+
+def bench_build(workdir, csv_path, repeat, workers=3):
+    """orchestrator.py end to end (no build cache) on the fake LLM."""
+    os.makedirs(workdir, exist_ok=True)
+    for name in BUILD_INPUTS:
+        shutil.copy(os.path.join(BASE_DIR, name), workdir)
+
+    env = {**os.environ, "AUTODEV_FAKE_LLM": "1"}
+    cmd = [
+        sys.executable, os.path.join(BASE_DIR, "orchestrator.py"),
+        "--data", csv_path, "--workers", str(workers), "--no-cache"
+    ]
+
+    def build():
+        subprocess.run(cmd, cwd=workdir, env=env, check=True, capture_output=True)
+
+    return {"orchestrator_build": measure(build, repeat)}
@@ -0,0 +1,137 @@
+"""
+AutoDev benchmark suite.
+
+    python benchmarks/run.py [--rows 20000] [--suites startup,pipeline,serving]
+                             [--out benchmarks/results/<commit>.json]
+
+Generates a synthetic CSV, then times:
+  startup   import of backend.app in a fresh interpreter
+  pipeline  DataInspectorAgent.inspect_csv(_fast), TrainerAgent.run,
+            a full orchestrator build (fake LLM, no build cache)
+  serving   in-process load tests of /predict, / and /chat
+
+All work happens in a temporary directory. Results are JSON; compare
+two runs with benchmarks/compare.py.
+"""
+# ---------- PATH FIX (MUST BE FIRST) ----------
+import sys
+import os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks import datagen, import_time, pipeline, serving
+
+SUITES = ("startup", "pipeline", "serving")
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return out + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_startup(repeat):
+    runs = [r["ms"] / 1000 for r in import_time.measure(repeat)]
+    return {
+        "import_backend_app": {
+            "median_s": statistics.median(runs),
+            "min_s": min(runs),
+            "max_s": max(runs),
+            "runs_s": runs
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AutoDev benchmarks")
+    parser.add_argument("--rows", type=int, default=20_000, help="Synthetic CSV rows")
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per timed stage / rounds per load test")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per load test")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--suites", default=",".join(SUITES))
+    parser.add_argument("--out", help="Results file (default: results/<commit>.json)")
+    args = parser.parse_args()
+
+    suites = [s for s in args.suites.split(",") if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args)
+        },
+        "results": {}
+    }
+    results = report["results"]
+
+    with tempfile.TemporaryDirectory(prefix="autodev-bench-") as workdir:
+        csv_path = datagen.make_csv(
+            os.path.join(workdir, "bench.csv"), args.rows, args.features
+        )
+        print(f"ℹ️ {args.rows} x {args.features} synthetic CSV in {workdir}")
+
+        if "startup" in suites:
+            results.update(bench_startup(args.repeat))
+            print("✅ startup")
+
+        if "pipeline" in suites or "serving" in suites:
+            results.update(pipeline.bench_train(workdir, csv_path, args.repeat))
+
+        if "pipeline" in suites:
+            results.update(pipeline.bench_inspect(csv_path, args.repeat))
+            results.update(pipeline.bench_build(
+                os.path.join(workdir, "build"), csv_path, args.repeat
+            ))
+            print("✅ pipeline")
+
+        if "serving" in suites:
+            results.update(serving.bench_serving(
+                workdir, args.requests, args.concurrency, rounds=args.repeat
+            ))
+            print("✅ serving")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        if "median_s" in result:
+            print(f"  {name:<22} median {result['median_s'] * 1000:9.1f}ms")
+        else:
+            print(f"  {name:<22} {result['throughput_rps']:8.0f} req/s  "
+                  f"p50 {result['p50_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms  "
+                  f"errors {result['errors']}")
+    print(f"✅ Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+In-process load tests of the backend hot paths.
+
+The app is started with fastapi's TestClient (startup and warm-up
+included), pointed at the artifacts trained in `workdir`. Load is then
+driven over ASGI by `concurrency` async clients on one event loop, so
+no sockets or client threads sit between the timer and the app. Each
+result reports throughput and latency percentiles.
+"""
+import os
+import time
+import asyncio
+
+import httpx
+import numpy as np
+
+READY_TIMEOUT_S = 60
+WARMUP_REQUESTS = 20
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000)
+
+
+def load_test(app, method, path, body_for, requests, concurrency, rounds=1):
+    """Median of each metric over `rounds` runs: one noisy round can't fail a compare."""
+    runs = [
+        asyncio.run(_load_test(app, method, path, body_for, requests, concurrency))
+        for _ in range(rounds)
+    ]
+    result = {key: float(np.median([run[key] for run in runs])) for key in runs[0]}
+    result.update(requests=requests, concurrency=concurrency, rounds=rounds,
+                  errors=sum(run["errors"] for run in runs))
+    return result
+
+
+async def _load_test(app, method, path, body_for, requests, concurrency):
+    latencies, statuses = [], []
+    next_request = iter(range(requests))
+
+    async def worker(client):
+        for i in next_request:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body_for(i))
+            latencies.append(time.perf_counter() - started)
+            statuses.append(response.status_code)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Untimed warm-up: first-call costs (imports, lazy pools) are not load
+        for i in range(min(WARMUP_REQUESTS, requests)):
+            await client.request(method, path, json=body_for(i))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(status >= 400 for status in statuses),
+        "throughput_rps": requests / wall,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p90_ms": percentile_ms(latencies, 90),
+        "p99_ms": percentile_ms(latencies, 99),
+        "max_ms": max(latencies) * 1000
+    }
+
+
+def _use_workdir(server, workdir):
+    """Serve workdir's artifacts instead of the repo's."""
+    from agents.trainer_agent.array_artifacts import ARRAYS_DIR
+
+    store = server.artifacts
+    store.model_path = os.path.join(workdir, "model.pkl")
+    store.preprocessor_path = os.path.join(workdir, "preprocessor.pkl")
+    store.metadata_path = os.path.join(workdir, "model_metadata.json")
+    store.strategy_path = os.path.join(workdir, "training_strategy_v1.json")
+    store.arrays_path = os.path.join(workdir, ARRAYS_DIR)
+
+    # Predict pool workers open their own store from these
+    server.ARTIFACT_ARGS = (
+        store.model_path, store.preprocessor_path, store.metadata_path,
+        store.strategy_path, store.arrays_path, store.mmap
+    )
+
+
+def _wait_ready(client):
+    deadline = time.monotonic() + READY_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if client.get("/ready").status_code == 200:
+            return
+        time.sleep(0.05)
+    raise RuntimeError("Backend warm-up did not finish")
+
+
+def bench_serving(workdir, requests, concurrency, rounds=3, seed=0):
+    # Must be set before backend.app (and the session store) import
+    os.environ.setdefault("AUTODEV_FAKE_LLM", "1")
+    os.environ["AUTODEV_SESSION_DB"] = os.path.join(workdir, "sessions.sqlite")
+
+    from fastapi.testclient import TestClient
+    import backend.app as server
+
+    _use_workdir(server, workdir)
+
+    with TestClient(server.app) as client:
+        _wait_ready(client)
+        n_features = server.artifacts.current.metadata["feature_count"]
+
+        # Fresh vectors miss the result cache; a repeated one hits it
+        rows = np.random.default_rng(seed).normal(size=(requests, n_features)).tolist()
+        hot_row = rows[0]
+
+        return {
+            "http_predict": load_test(
+                server.app, "POST", "/predict", lambda i: {"features": rows[i]},
+                requests, concurrency, rounds
+            ),
+            "http_predict_cached": load_test(
+                server.app, "POST", "/predict", lambda i: {"features": hot_row},
+                requests, concurrency, rounds
+            ),
+            "http_index": load_test(
+                server.app, "GET", "/", lambda i: None, requests, concurrency, rounds
+            ),
+            "http_chat": load_test(
+                server.app, "POST", "/chat",
+                lambda i: {"message": f"A portfolio site with a blog, visitor {i}"},
+                requests, concurrency, rounds
+            )
+        }
@@ -0,0 +1,180 @@
+import os
+import glob
+import json
+import shutil
+import hashlib
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Shared by every build (and every /go job), so keep it out of the cwd
+CACHE_DIR = os.getenv(
+    "AUTODEV_CACHE_DIR",
+    os.path.join(BASE_DIR, ".autodev_cache", "stages")
+)
+
+# Modules shared by every agent (gateway, metrics, columnar readers, ...)
+SHARED_DIR = os.path.join(BASE_DIR, "agents")
+
+# Inputs above this size are fingerprinted, not fully hashed
+FULL_HASH_BYTES = 64 * 1024 * 1024
+EDGE_BYTES = 1024 * 1024
+
+
+class BuildCache:
+    """
+    Content-addressed cache of stage outputs.
+
+    A stage's key hashes its name, command line, the content of every
+    input artifact, the source of its agent package and the shared
+    agents/*.py modules. Any change to a spec, profile, strategy, plan,
+    dataset or agent code gives a new key, so stale outputs are never
+    restored.
+
+    An entry is only stored, and only restored, when it holds every
+    output the stage declares.
+    """
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    # ---------------- KEYS ----------------
+
+    def key(self, stage):
+        h = hashlib.sha256()
+        h.update(stage.name.encode())
+        h.update(json.dumps(stage.cmd).encode())
+
+        for path in sorted(stage.inputs):
+            h.update(path.encode())
+            h.update(self.fingerprint(path))
+
+        h.update(self.agent_version(stage.cmd[1]))
+        return h.hexdigest()
+
+    def fingerprint(self, path):
+        if os.path.isdir(path):
+            return self._listing_fingerprint(path, _walk(path))
+        if not os.path.exists(path):
+            if any(ch in path for ch in "*?["):
+                return self._listing_fingerprint(path, glob.iglob(path, recursive=True))
+            return b"missing"
+
+        size = os.path.getsize(path)
+        h = hashlib.sha256()
+
+        if size <= FULL_HASH_BYTES:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(EDGE_BYTES), b""):
+                    h.update(block)
+            return h.digest()
+
+        # Datasets: size + mtime + first/last MB
+        stat = os.stat(path)
+        h.update(f"{size}:{stat.st_mtime_ns}".encode())
+        with open(path, "rb") as f:
+            h.update(f.read(EDGE_BYTES))
+            f.seek(-EDGE_BYTES, os.SEEK_END)
+            h.update(f.read(EDGE_BYTES))
+        return h.digest()
+
+    def _listing_fingerprint(self, root, files):
+        """Corpus datasets (a directory or glob): path + size + mtime per file."""
+        h = hashlib.sha256(b"listing")
+        for path in sorted(files):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed while listing, or a broken link
+            if os.path.isdir(path):
+                continue
+            h.update(f"{os.path.relpath(path, root)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return h.digest()
+
+    def agent_version(self, script):
+        """Hash of every .py file in the agent's package and in agents/."""
+        h = hashlib.sha256()
+        agent_dir = os.path.join(BASE_DIR, os.path.dirname(script))
+        if not os.path.isdir(agent_dir):
+            return b"unknown"
+
+        for directory in sorted({agent_dir, SHARED_DIR}):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py"):
+                    with open(os.path.join(directory, name), "rb") as f:
+                        h.update(os.path.relpath(f.name, BASE_DIR).encode())
+                        h.update(f.read())
+        return h.digest()
+
+    # ---------------- STORE / RESTORE ----------------
+
+    def restore(self, key, outputs):
+        entry = os.path.join(self.root, key)
+        manifest_path = os.path.join(entry, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return False
+
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        # An entry missing a declared output would restore a partial build
+        if any(p not in manifest["outputs"] for p in outputs):
+            return False
+
+        for path, stored in manifest["outputs"].items():
+            src = os.path.join(entry, stored)
+            if not os.path.exists(src):
+                return False
+
+        for path, stored in manifest["outputs"].items():
+            self._copy(os.path.join(entry, stored), path)
+        return True
+
+    def store(self, key, outputs):
+        """Returns False (nothing stored) if a required output is missing."""
+        entry = os.path.join(self.root, key)
+        if os.path.exists(entry):
+            return True
+
+        if any(not os.path.exists(p) for p in outputs):
+            return False
+
+        # Build in a temp dir and rename, so concurrent builds
+        # never see a half-written entry
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+
+        stored = {}
+        for i, path in enumerate(outputs):
+            if not os.path.exists(path):
+                continue
+            name = f"{i}_{os.path.basename(path.rstrip('/'))}"
+            self._copy(path, os.path.join(tmp, name))
+            stored[path] = name
+
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump({"outputs": stored}, f, indent=2)
+
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # Another build stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+        return True
+
+    def _copy(self, src, dst):
+        parent = os.path.dirname(dst)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        # Plain copies (fresh mtime), so file watchers see a restore
+        if os.path.isdir(src):
+            shutil.rmtree(dst, ignore_errors=True)
+            shutil.copytree(src, dst, copy_function=shutil.copy)
+        else:
+            shutil.copy(src, dst)
+
+
+def _walk(root):
+    for parent, dirs, files in os.walk(root):
+        for name in files:
+            yield os.path.join(parent, name)
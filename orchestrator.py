@@ -1,71 +1,483 @@
 import os
+import sys
 import json
+import time
+import argparse
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
-def run(cmd):
-    print("▶", " ".join(cmd))
-    subprocess.run(cmd, check=True)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
 
-def write_status(status):
-    with open("build_status.json", "w") as f:
-        json.dump({"status": status}, f)
+from build_cache import BuildCache
+from agents.metrics import REGISTRY
 
-def main():
+STAGE_SECONDS = REGISTRY.histogram(
+    "build_stage_seconds", "Duration of orchestrator stages", ("stage", "status")
+)
+
+STATUS_PATH = "build_status.json"
+DEFAULT_WORKERS = 3
+
+APP_SPEC = "application_spec_v1.json"
+OUTPUT_ROOT = "generated_projects"
+
+_print_lock = threading.Lock()
+
+
+class Stage:
+    """
+    One pipeline step.
+    Dependencies are derived from inputs/outputs: a stage waits for
+    every stage that produces one of its inputs.
+    `when` is checked once the stage is ready; False skips it.
+    Every output must exist for the stage to be cached.
+    """
+
+    def __init__(self, name, cmd, inputs=(), outputs=(), when=None):
+        self.name = name
+        self.cmd = cmd
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.when = when
+
+
+def project_dirs(spec_path=APP_SPEC):
+    """
+    (backend_dir, frontend_dir) of the generated project.
+
+    The builders name it after the application in the plan, which the
+    composer copies from the application spec, so the slug is derived
+    from the spec already on disk when the stages are laid out.
+    """
+    name = "AutoDev App"
+    if os.path.exists(spec_path):
+        with open(spec_path) as f:
+            spec = json.load(f)
+        if "website" in spec:
+            name = spec.get("application", {}).get("name", "autodev_project")
+        else:
+            name = spec.get("app_name", name)
+
+    slug = name.lower().replace(" ", "_").replace("-", "_")
+    root = os.path.join(OUTPUT_ROOT, slug)
+    return os.path.join(root, "backend"), os.path.join(root, "frontend")
+
+
+def build_stages(data_path="data/sample.csv", spec_path=APP_SPEC):
+    backend_dir, frontend_dir = project_dirs(spec_path)
+    backend_plan = os.path.join(backend_dir, "backend_plan.json")
+
+    return [
+        # 1. Strategy (optional, safe if non-AI)
+        Stage(
+            "strategy",
+            ["python", "agents/strategy_agent/strategy_agent.py",
+             "project_spec_v1.json", "data_profile_v1.json"],
+            inputs=["project_spec_v1.json", "data_profile_v1.json"],
+            outputs=["training_strategy_v1.json"],
+            when=lambda: os.path.exists("data_profile_v1.json")
+        ),
+        # 2. Train model if strategy says so
+        Stage(
+            "train",
+            ["python", "agents/trainer_agent/trainer_agent.py",
+             "training_strategy_v1.json", "data_profile_v1.json", data_path],
+            inputs=["training_strategy_v1.json", "data_profile_v1.json", data_path],
+            outputs=["model_arrays", "model_metadata.json"],
+            when=lambda: os.path.exists("training_strategy_v1.json")
+        ),
+        # 3. Compose application
+        Stage(
+            "compose",
+            ["python", "agents/application_composer/application_composer_agent.py",
+             "application_spec_v1.json", "training_strategy_v1.json"],
+            inputs=["application_spec_v1.json", "training_strategy_v1.json"],
+            outputs=["application_plan_v1.json"]
+        ),
+        # 4. Build backend PLAN (NO LLM)
+        Stage(
+            "backend_plan",
+            ["python", "agents/backend_builder/backend_builder_agent.py",
+             "application_plan_v1.json", "training_strategy_v1.json"],
+            inputs=["application_plan_v1.json", "training_strategy_v1.json"],
+            outputs=[backend_plan]
+        ),
+        # 5. Generate backend CODE (LLM)
+        Stage(
+            "backend_codegen",
+            ["python", "agents/backend_codegen/backend_codegen_agent.py",
+             backend_plan, backend_dir],
+            inputs=[backend_plan],
+            outputs=[os.path.join(backend_dir, "app.py"),
+                     os.path.join(backend_dir, "requirements.txt")]
+        ),
+        # 6. Generate frontend (LLM HTML)
+        Stage(
+            "frontend",
+            ["python", "agents/frontend_builder/frontend_builder_agent.py",
+             "application_plan_v1.json"],
+            inputs=["application_plan_v1.json"],
+            outputs=[os.path.join(frontend_dir, "index.html")]
+        ),
+    ]
+
+
+# ============================================================
+# IN-PROCESS STAGES
+# ============================================================
+# Script path -> fn(args, artifacts). Each mirrors the agent's CLI
+# (same arguments, same files written) but runs in this interpreter,
+# so pandas/sklearn/genai are imported once per build, not per stage.
+# `artifacts` maps output paths to objects produced earlier in the
+# run; those are handed to the next agent without re-reading JSON.
+
+def _resolve(args, artifacts):
+    return [artifacts.get(a, a) for a in args]
+
+
+def _write_json(path, obj):
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=2)
+
+
+def _inspect(args, artifacts):
+    from agents.data_inspector.data_inspector import DataInspectorAgent
+
+    out = DataInspectorAgent().run(*args[:2])
+    _write_json("data_profile_v1.json", out)
+    print("✅ data_profile_v1.json created")
+    return {"data_profile_v1.json": out}
+
+
+def _strategy(args, artifacts):
+    from agents.strategy_agent.strategy_agent import StrategyAgent
+
+    out = StrategyAgent().run(*_resolve(args[:2], artifacts), use_llm=True)
+    _write_json("training_strategy_v1.json", out)
+    print("✅ training_strategy_v1.json created")
+    return {"training_strategy_v1.json": out}
+
+
+def _train(args, artifacts):
+    from agents.trainer_agent.trainer_agent import TrainerAgent
+
+    TrainerAgent().run(*_resolve(args[:3], artifacts))
+
+
+def _compose(args, artifacts):
+    from agents.application_composer.application_composer_agent import ApplicationComposerAgent
+
+    out = ApplicationComposerAgent().run(*_resolve(args[:2], artifacts))
+    _write_json("application_plan_v1.json", out)
+    print("✅ application_plan_v1.json created")
+    return {"application_plan_v1.json": out}
+
+
+def _backend_plan(args, artifacts):
+    from agents.backend_builder.backend_builder_agent import BackendBuilderAgent
+
+    out = BackendBuilderAgent().run(*_resolve(args[:2], artifacts))
+    return {os.path.join(project_dirs()[0], "backend_plan.json"): out}
+
+
+def _backend_codegen(args, artifacts):
+    from agents.backend_codegen.backend_codegen_agent import BackendCodegenAgent
+
+    BackendCodegenAgent().run(*_resolve(args[:2], artifacts))
+
+
+def _frontend(args, artifacts):
+    from agents.frontend_builder.frontend_builder_agent import FrontendBuilderAgent
+
+    FrontendBuilderAgent().run(*_resolve(args[:1], artifacts))
+
+
+IN_PROCESS = {
+    "agents/data_inspector/data_inspector.py": _inspect,
+    "agents/strategy_agent/strategy_agent.py": _strategy,
+    "agents/trainer_agent/trainer_agent.py": _train,
+    "agents/application_composer/application_composer_agent.py": _compose,
+    "agents/backend_builder/backend_builder_agent.py": _backend_plan,
+    "agents/backend_codegen/backend_codegen_agent.py": _backend_codegen,
+    "agents/frontend_builder/frontend_builder_agent.py": _frontend,
+}
+
+
+def run_in_process(cmd, artifacts, name="build"):
+    log(name, "▶ (in-process) " + " ".join(cmd[1:]))
+
+    output = sys.stdout
+    if isinstance(output, StageOutput):
+        output.local.stage = name
+    try:
+        produced = IN_PROCESS[cmd[1]](cmd[2:], artifacts)
+    finally:
+        if isinstance(output, StageOutput):
+            output.end_stage()
+
+    artifacts.update(produced or {})
+
+
+class StageOutput:
+    """
+    sys.stdout stand-in for in-process runs.
+    Lines an agent prints are prefixed with the stage running on
+    the current thread, like the streamed subprocess output.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        name = getattr(self.local, "stage", None)
+        if name is None:
+            return self.stream.write(text)
+
+        *lines, self.local.pending = (getattr(self.local, "pending", "") + text).split("\n")
+        with _print_lock:
+            for line in lines:
+                self.stream.write(f"[{name}] {line}\n")
+            self.stream.flush()
+        return len(text)
+
+    def end_stage(self):
+        name = self.local.stage
+        pending = getattr(self.local, "pending", "")
+        self.local.stage = None
+        self.local.pending = ""
+        if pending:
+            log(name, pending)
+
+    def flush(self):
+        self.stream.flush()
+
+
+# ============================================================
+# BUILD STATUS
+# ============================================================
+class BuildStatus:
+    """Thread-safe writer for build_status.json, including per-stage timing."""
+
+    def __init__(self, path=STATUS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {"status": "STARTED", "started_at": time.time(), "stages": {}}
+
+    def set(self, status, **fields):
+        with self.lock:
+            self.state["status"] = status
+            self.state.update(fields)
+            if status in ("DONE", "FAILED"):
+                self.state["duration_s"] = round(time.time() - self.state["started_at"], 3)
+            self._write()
+
+    def stage(self, name, status, **fields):
+        with self.lock:
+            entry = self.state["stages"].setdefault(name, {})
+            entry["status"] = status
+            entry.update(fields)
+            self._write()
+
+        if "duration_s" in fields:
+            STAGE_SECONDS.observe(fields["duration_s"], stage=name, status=status)
+
+    def _write(self):
+        # Atomic replace: the backend may read this file mid-build
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+class Scheduler:
+    """
+    Runs stages as soon as their producers finish,
+    at most `workers` at a time.
+    isolate=True runs every stage in its own python subprocess;
+    otherwise stages run in-process and share `artifacts`.
+    With a cache, a stage whose inputs and agent code are unchanged
+    restores its outputs instead of running.
+    """
+
+    def __init__(self, stages, workers=DEFAULT_WORKERS, status=None,
+                 isolate=False, cache=None):
+        self.stages = {s.name: s for s in stages}
+        self.workers = workers
+        self.status = status or BuildStatus()
+        self.isolate = isolate
+        self.cache = cache
+        self.artifacts = {}
+        self.deps = self._dependencies(stages)
+
+    def _dependencies(self, stages):
+        producers = {}
+        for s in stages:
+            for out in s.outputs:
+                producers[out] = s.name
+
+        return {
+            s.name: {producers[i] for i in s.inputs if i in producers} - {s.name}
+            for s in stages
+        }
+
+    def run(self):
+        pending = set(self.stages)
+        done = set()
+        failed = []
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                if not failed:
+                    ready = [n for n in pending if self.deps[n] <= done]
+                    for name in sorted(ready):
+                        pending.discard(name)
+                        running[pool.submit(self._run_stage, self.stages[name])] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        done.add(name)
+                    except Exception as e:
+                        failed.append(name)
+                        log(name, f"❌ {e}")
+
+        if failed:
+            raise RuntimeError(f"Stages failed: {', '.join(failed)}")
+
+    def _run_stage(self, stage):
+        if stage.when and not stage.when():
+            self.status.stage(stage.name, "SKIPPED")
+            log(stage.name, "⏭ skipped")
+            return
+
+        started = time.time()
+
+        key = self.cache.key(stage) if self.cache else None
+        if key and self.cache.restore(key, stage.outputs):
+            self.status.stage(
+                stage.name, "CACHED",
+                cache_key=key,
+                duration_s=round(time.time() - started, 3)
+            )
+            log(stage.name, f"♻ cache hit {key[:12]}")
+            return
+
+        self.status.stage(stage.name, "RUNNING", started_at=started)
+
+        try:
+            if self.isolate:
+                run(stage.cmd, stage.name)
+            else:
+                run_in_process(stage.cmd, self.artifacts, stage.name)
+        except Exception:
+            self.status.stage(
+                stage.name, "FAILED",
+                duration_s=round(time.time() - started, 3)
+            )
+            raise
+
+        if key and not self.cache.store(key, stage.outputs):
+            log(stage.name, "⚠️ not cached: a declared output is missing")
+
+        self.status.stage(
+            stage.name, "DONE",
+            finished_at=time.time(),
+            duration_s=round(time.time() - started, 3)
+        )
+
+
+def log(name, line):
+    with _print_lock:
+        print(f"[{name}] {line}", flush=True)
+
+
+def run(cmd, name="build"):
+    log(name, "▶ " + " ".join(cmd))
+
+    # Agent scripts live next to this file; builds may run in a job's
+    # own work directory (backend/builds.py)
+    cmd = [sys.executable if cmd[0] == "python" else cmd[0],
+           os.path.join(BASE_DIR, cmd[1]), *cmd[2:]]
+
+    # Stream the child's output line by line, prefixed by stage
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"}
+    )
+    for line in proc.stdout:
+        log(name, line.rstrip("\n"))
+
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def main(workers=DEFAULT_WORKERS, data_path="data/sample.csv", isolate=False,
+         use_cache=True):
     print("🚀 AutoDev Orchestrator v2")
-    write_status("STARTED")
-
-    # 1. Strategy (optional, safe if non-AI)
-    if os.path.exists("data_profile_v1.json"):
-        run([
-            "python",
-            "agents/strategy_agent/strategy_agent.py",
-            "project_spec_v1.json",
-            "data_profile_v1.json"
-        ])
-
-    # 2. Train model if strategy says so
-    if os.path.exists("training_strategy_v1.json"):
-        run([
-            "python",
-            "agents/trainer_agent/trainer_agent.py",
-            "training_strategy_v1.json",
-            "data_profile_v1.json",
-            "data/sample.csv"
-        ])
-
-    # 3. Compose application
-    run([
-        "python",
-        "agents/application_composer/application_composer_agent.py",
-        "application_spec_v1.json",
-        "training_strategy_v1.json"
-    ])
-
-    # 4. Build backend PLAN (NO LLM)
-    run([
-        "python",
-        "agents/backend_builder/backend_builder_agent.py",
-        "application_plan_v1.json",
-        "training_strategy_v1.json"
-    ])
-
-    # 5. Generate backend CODE (LLM)
-    run([
-        "python",
-        "agents/backend_codegen/backend_codegen_agent.py",
-        "generated_projects/portfolio_website_with_blog/backend/backend_plan.json",
-        "generated_projects/portfolio_website_with_blog/backend"
-    ])
-
-    # 6. Generate frontend (LLM HTML)
-    run([
-        "python",
-        "agents/frontend_builder/frontend_builder_agent.py",
-        "application_plan_v1.json"
-    ])
-
-    write_status("DONE")
+    status = BuildStatus()
+    status.set("STARTED")
+
+    scheduler = Scheduler(
+        build_stages(data_path),
+        workers=workers,
+        status=status,
+        isolate=isolate,
+        cache=BuildCache() if use_cache else None
+    )
+
+    stdout = sys.stdout
+    if not isolate:
+        sys.stdout = StageOutput(stdout)
+    try:
+        scheduler.run()
+    except Exception:
+        status.set("FAILED")
+        raise
+    finally:
+        sys.stdout = stdout
+
+    # In-process builds share one LLM cache; report how well it did
+    llm_cache = sys.modules.get("agents.llm_cache")
+    stats = llm_cache.shared_stats() if llm_cache else None
+    if stats:
+        print(f"ℹ️ LLM cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    status.set("DONE", llm_cache=stats)
     print("✅ AutoDev build complete")
 
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Stages allowed to run at the same time")
+    parser.add_argument("--data", default="data/sample.csv",
+                        help="Dataset used by the training stage")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run each stage in its own python subprocess")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rerun every stage, ignoring the build cache")
+    args = parser.parse_args()
+
+    main(
+        workers=args.workers,
+        data_path=args.data,
+        isolate=args.isolate,
+        use_cache=not args.no_cache
+    )
@@ -2,12 +2,20 @@ import argparse
 import os
 import subprocess
 from agents.self_healing.self_healing_agent import SelfHealingAgent
+from orchestrator import run_in_process
 
 ROOT = os.getcwd()
 
+# Subprocess-per-agent when True; otherwise agents run in this interpreter
+ISOLATE = False
+ARTIFACTS = {}
+
 def run(cmd):
     print("\n▶", " ".join(cmd))
-    SelfHealingAgent().run_with_healing(cmd)
+    if ISOLATE:
+        SelfHealingAgent().run_with_healing(cmd)
+    else:
+        run_in_process(cmd, ARTIFACTS)
 
 def file_exists(path):
     return os.path.exists(path)
@@ -74,6 +82,9 @@ def main(data_path=None):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", help="Path to dataset (optional)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run each agent in its own python subprocess")
     args = parser.parse_args()
 
+    ISOLATE = args.isolate
     main(args.data)
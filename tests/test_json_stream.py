@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from agents.chat_spec_agent.json_stream import JSONFieldStream, parse_object
+
+UPDATE = {
+    "status": "draft",
+    "current_plan": {"app_type": "website", "pages": ["Home", "{Blog}"]},
+    "suggested_features": [],
+    "questions": ["Call it \"Folio\" {or not}?"]
+}
+
+
+def feed_all(text, chunk_size):
+    parser = JSONFieldStream()
+    events = []
+    for i in range(0, len(text), chunk_size):
+        fields = parser.feed(text[i:i + chunk_size])
+        if parser.reset:
+            events.append("reset")
+        if fields:
+            events.append(fields)
+    return parser, events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 10_000])
+@pytest.mark.parametrize("wrap", [
+    "{}",
+    "```json\n{}\n```",
+    "Sure, here it is:\n```json\n{}\n```\nAnything else?",
+    "Use {{name}} or {{\"a\" b}} here, then:\n{}",
+    'He said "hi {{" and then {}',
+])
+def test_finds_the_object(wrap, chunk_size):
+    parser, _ = feed_all(wrap.format(json.dumps(UPDATE)), chunk_size)
+    assert parser.result() == UPDATE
+
+
+def test_fields_stream_before_the_object_closes():
+    text = json.dumps(UPDATE)
+    parser = JSONFieldStream()
+    cut = text.index('"current_plan"')
+    assert parser.feed(text[:cut]) == {"status": "draft"}
+    assert parser.result() is None
+    parser.feed(text[cut:])
+    assert parser.result() == UPDATE
+
+
+def test_reset_after_fields_from_a_false_start():
+    parser, events = feed_all('{"status": "x", oops} {"status": "draft"}', 1)
+    assert events == [{"status": "x"}, "reset", {"status": "draft"}]
+    assert parser.result() == {"status": "draft"}
+
+
+def test_invalid_value_restarts():
+    parser, _ = feed_all('{"a": tru} {"b": 1}', 4)
+    assert parser.result() == {"b": 1}
+
+
+def test_trailing_comma_is_not_an_object():
+    assert parse_object('{"a": 1,} {"c": 2}') == {"c": 2}
+
+
+def test_empty_object():
+    assert parse_object("reply: {}") == {}
+
+
+def test_no_object():
+    assert parse_object("I could not produce JSON {this time}") is None